@@ -2,6 +2,7 @@ from fastapi import FastAPI, UploadFile, File, HTTPException, Form
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict
+import logging
 import os
 import shutil
 from datetime import datetime
@@ -16,7 +17,11 @@ from src.database.repositories.transcription_repository import TranscriptionRepo
 from src.database.repositories.message_repository import MessageRepository
 from src.database.connection import db
 from src.core.context import MediaContext
-from src.utils.s3_upload import init_s3_client, upload_file_to_s3
+from src.utils.s3_upload import init_s3_client, upload_file_to_s3_async
+from src.config import LOG_LEVEL
+
+# Service loggers (download progress, retries, chunk progress) - print() output is unaffected
+logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 # Initialize database
 print("🔌 Initializing database connection...")
@@ -43,6 +48,11 @@ message_repo = MessageRepository()
 # Initialize S3 client
 init_s3_client()
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Release pooled connections"""
+    await media_service.aclose()
+
 # Pydantic models for API
 class TranscribeResponse(BaseModel):
     success: bool
@@ -146,7 +156,7 @@ async def transcribe_audio_file(
         temp_path = os.path.join(audio_dir, temp_filename)
         
         with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+            shutil.copyfileobj(file.file, buffer, length=1 << 20)  # 1 MiB buffer - far fewer read/write calls than the 64 KiB default
         
         # Transcribe
         transcribed = await media_service.transcribe_audio(temp_path)
@@ -186,7 +196,7 @@ async def transcribe_audio_file(
         
         # Upload to S3
         s3_transcript_key = f"transcripts/{transcript_filename}"
-        s3_transcript_url = upload_file_to_s3(transcript_local_path, s3_transcript_key)
+        s3_transcript_url = await upload_file_to_s3_async(transcript_local_path, s3_transcript_key)
         
         # Create context
         context = MediaContext(
@@ -205,7 +215,7 @@ async def transcribe_audio_file(
         final_path = os.path.join(audio_dir, final_filename)
         
         if os.path.exists(temp_path):
-            shutil.move(temp_path, final_path)
+            os.replace(temp_path, final_path)  # Same directory - plain atomic rename
         
         return TranscribeResponse(
             success=True,
@@ -296,7 +306,7 @@ async def transcribe_audio_url_mobile(request: AudioUrlMobileRequest):
         
         # Upload to S3
         s3_transcript_key = f"transcripts/{transcript_filename}"
-        s3_transcript_url = upload_file_to_s3(transcript_local_path, s3_transcript_key)
+        s3_transcript_url = await upload_file_to_s3_async(transcript_local_path, s3_transcript_key)
         
         # Create transcription in database
         transcription_id = transcription_repo.create_transcription(transcribed)
@@ -395,7 +405,7 @@ async def transcribe_video_url(request: VideoUrlRequest):
         
         # Upload to S3
         s3_transcript_key = f"transcripts/{transcript_filename}"
-        s3_transcript_url = upload_file_to_s3(transcript_local_path, s3_transcript_key)
+        s3_transcript_url = await upload_file_to_s3_async(transcript_local_path, s3_transcript_key)
         
         # Create context
         context = MediaContext(
@@ -495,7 +505,7 @@ async def transcribe_video_url_mobile(request: VideoUrlMobileRequest):
         
         # Upload to S3
         s3_transcript_key = f"transcripts/{transcript_filename}"
-        s3_transcript_url = upload_file_to_s3(transcript_local_path, s3_transcript_key)
+        s3_transcript_url = await upload_file_to_s3_async(transcript_local_path, s3_transcript_key)
         
         # Create transcription in database
         transcription_id = transcription_repo.create_transcription(transcribed)
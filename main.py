@@ -1,3 +1,4 @@
+import logging
 from telethon import events
 from src.clients.telegram_client import TelegramBotClient
 from src.repositories.user_repository import UserRepository
@@ -7,6 +8,10 @@ from src.services.ai_service import AIService
 from src.handlers.command_handler import CommandHandler
 from src.handlers.message_handler import MessageHandler
 from src.database.connection import db
+from src.config import LOG_LEVEL
+
+# Service loggers (download progress, retries, chunk progress) - print() output is unaffected
+logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 # Initialize database
 print("🔌 Initializing database connection...")
@@ -67,7 +72,10 @@ async def handler(event):
 async def main():
     print("🤖 Bot đã sẵn sàng!")
     print("📝 Bot sẽ chỉ xử lý tin nhắn từ users đã /start")
-    await client.run_until_disconnected()
+    try:
+        await client.run_until_disconnected()
+    finally:
+        await media_service.aclose()
 
 if __name__ == "__main__":
     with client:
@@ -1,7 +1,11 @@
+import json
 import requests
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 from src.config import OPENROUTER_API_KEY, OPENROUTER_MODEL
 
+# Stand-in for the audio payload while the JSON body is serialized (base64 never contains '<')
+_AUDIO_PLACEHOLDER = "<audio_base64>"
+
 class OpenRouterAPI:
     def __init__(self):
         self.api_key = OPENROUTER_API_KEY
@@ -48,8 +52,27 @@ class OpenRouterAPI:
             return None
             
     
-    def transcribe_audio(self, audio_base64: str, timeout: int = 120) -> Optional[str]:
-        """Transcribe audio using OpenRouter"""
+    def _transcribe_body(self, audio_base64: Union[bytes, str]) -> bytes:
+        """
+        Build the JSON request body. The base64 payload is spliced in as raw bytes -
+        it is already valid JSON string content, so it is never decoded or re-escaped.
+        """
+        if isinstance(audio_base64, str):
+            audio_base64 = audio_base64.encode('ascii')
+        head, tail = json.dumps({
+            "model": self.model,
+            "messages": [{
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "Transcribe this audio accurately."},
+                    {"type": "input_audio", "input_audio": {"data": _AUDIO_PLACEHOLDER, "format": "mp3"}}
+                ]
+            }]
+        }).encode('utf-8').split(_AUDIO_PLACEHOLDER.encode('ascii'))
+        return b"".join((head, audio_base64, tail))
+    
+    def transcribe_audio(self, audio_base64: Union[bytes, str], timeout: int = 120) -> Optional[str]:
+        """Transcribe audio using OpenRouter (audio_base64 may be the raw bytes from b64encode)"""
         try:
             response = requests.post(
                 f"{self.base_url}/chat/completions",
@@ -57,16 +80,7 @@ class OpenRouterAPI:
                     "Authorization": f"Bearer {self.api_key}",
                     "Content-Type": "application/json",
                 },
-                json={
-                    "model": self.model,
-                    "messages": [{
-                        "role": "user",
-                        "content": [
-                            {"type": "text", "text": "Transcribe this audio accurately."},
-                            {"type": "input_audio", "input_audio": {"data": audio_base64, "format": "mp3"}}
-                        ]
-                    }]
-                },
+                data=self._transcribe_body(audio_base64),
                 timeout=timeout
             )
             
@@ -21,15 +21,22 @@ class Config:
     # File paths
     USERS_FILE = os.getenv("USERS_FILE", "users.json")
     CONTEXT_DIR = os.getenv("CONTEXT_DIR", "user_contexts")
+    AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", "audio_cache")  # Downloaded audio reused for repeated URLs
+    TRANSCRIBE_TMPFS_DIR = os.getenv("TRANSCRIBE_TMPFS_DIR", None)  # RAM-backed dir for chunk files, used when it has room (default: system temp dir)
     
     # Limits
     MAX_MESSAGE_LENGTH = int(os.getenv("MAX_MESSAGE_LENGTH", "4096"))  # Telegram message limit
     MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", "10"))  # Maximum file size for transcription
+    MAX_HISTORY_TURNS = int(os.getenv("MAX_HISTORY_TURNS", "20"))  # Conversation turns (user + assistant) sent to AI
+    AUDIO_CACHE_MAX_MB = int(os.getenv("AUDIO_CACHE_MAX_MB", "5120"))  # Audio cache size limit (0 = disabled)
+    MAX_CONCURRENT_TRANSCRIPTIONS = int(os.getenv("MAX_CONCURRENT_TRANSCRIPTIONS", "5"))  # In-flight transcription API calls (adjustable at runtime)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # WARNING silences per-chunk progress logs
     
     # YouTube cookies file path (optional, for bypassing bot detection)
     YOUTUBE_COOKIES_FILE = os.getenv("YOUTUBE_COOKIES_FILE", None)  # Path to cookies.txt file
     YOUTUBE_COOKIES_FROM_BROWSER = os.getenv("YOUTUBE_COOKIES_FROM_BROWSER", None)  # Browser name: chrome, firefox, edge
     YOUTUBE_PROXY = os.getenv("YOUTUBE_PROXY", None)  # Proxy URL (e.g., http://proxy:port) for residential IP
+    YTDLP_CONCURRENT_FRAGMENTS = int(os.getenv("YTDLP_CONCURRENT_FRAGMENTS", "16"))  # Parallel fragments when aria2c is unavailable
     
     # S3 Configuration
     S3_ACCESS_KEY_ID = os.getenv("S3_ACCESS_KEY_ID")
@@ -70,8 +77,14 @@ print(f"   DATABASE_URL: {'✅ SET' if Config.DATABASE_URL else '❌ NOT SET (ne
 # File paths
 USERS_FILE = Config.USERS_FILE
 CONTEXT_DIR = Config.CONTEXT_DIR
+AUDIO_CACHE_DIR = Config.AUDIO_CACHE_DIR
+TRANSCRIBE_TMPFS_DIR = Config.TRANSCRIBE_TMPFS_DIR
 
 # Limits
 MAX_MESSAGE_LENGTH = Config.MAX_MESSAGE_LENGTH
 MAX_FILE_SIZE_MB = Config.MAX_FILE_SIZE_MB
+MAX_HISTORY_TURNS = Config.MAX_HISTORY_TURNS
+AUDIO_CACHE_MAX_MB = Config.AUDIO_CACHE_MAX_MB
+MAX_CONCURRENT_TRANSCRIPTIONS = Config.MAX_CONCURRENT_TRANSCRIPTIONS
+LOG_LEVEL = Config.LOG_LEVEL
 
@@ -1,15 +1,32 @@
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 import uuid
 
+# Namespace for mapping legacy ctx_<timestamp>_<hex> IDs onto stable UUIDs
+_LEGACY_ID_NAMESPACE = uuid.UUID('6f1c2d4e-8a3b-5c7d-9e0f-1a2b3c4d5e6f')
+
+def parse_context_id(context_id: Union[str, uuid.UUID]) -> uuid.UUID:
+    """
+    Accept either a UUID or its string form (only parses when needed).
+    Legacy ctx_<timestamp>_<hex> IDs map to a stable uuid5 - they never existed
+    in the database, so lookups by them simply find nothing.
+    """
+    if isinstance(context_id, uuid.UUID):
+        return context_id
+    if context_id.startswith('ctx_'):
+        return uuid.uuid5(_LEGACY_ID_NAMESPACE, context_id)
+    return uuid.UUID(context_id)
+
 class MediaContext:
     """Single context for one audio/video transcription"""
     def __init__(self, user_id: int, transcription: str = "", title: str = "", 
-                 summary: str = "", context_id: Optional[str] = None, 
+                 summary: str = "", context_id: Optional[Union[str, uuid.UUID]] = None, 
                  history: Optional[List[Dict]] = None, duration_seconds: int = 0,
                  source_type: str = "audio", transcript_file_path: Optional[str] = None):
         self.user_id = user_id
-        self.id = context_id or self._generate_id()
+        # Parse once - repositories use the UUID, handlers/API use the string form
+        self.uuid = parse_context_id(context_id) if context_id else self._generate_id()
+        self.id = str(self.uuid)
         self.title = title
         self.summary = summary
         self.transcription = transcription
@@ -19,11 +36,9 @@ class MediaContext:
         self.transcript_file_path = transcript_file_path  # Path to saved transcript file for very long texts
         self.history = history or []
     
-    def _generate_id(self) -> str:
-        """Generate unique context ID"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        short_uuid = str(uuid.uuid4())[:8]
-        return f"ctx_{timestamp}_{short_uuid}"
+    def _generate_id(self) -> uuid.UUID:
+        """Generate unique context ID (same ID space as database conversations)"""
+        return uuid.uuid4()
     
     def add_to_history(self, user_msg: str, ai_msg: str):
         """Add conversation turn to history"""
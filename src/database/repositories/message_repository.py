@@ -41,12 +41,19 @@ class MessageRepository:
         conversation_id: UUID,
         limit: Optional[int] = None
     ) -> List[Dict]:
-        """Get conversation history"""
+        """
+        Get conversation history in chronological order
+        
+        Args:
+            conversation_id: Conversation ID
+            limit: Optional max number of messages - keeps the most recent ones
+        """
         client = db.get_client()
         
+        # With a limit, fetch newest first so the DB only returns the tail of the conversation
         query = client.table('messages').select(
             'role, content, file_url, file_name, file_type, file_size, created_at'
-        ).eq('conversation_id', str(conversation_id)).order('created_at', desc=False)
+        ).eq('conversation_id', str(conversation_id)).order('created_at', desc=bool(limit))
         
         if limit:
             query = query.limit(limit)
@@ -54,6 +61,7 @@ class MessageRepository:
         result = query.execute()
         
         if result.data:
+            rows = reversed(result.data) if limit else result.data
             return [
                 {
                     "role": row['role'],
@@ -63,6 +71,6 @@ class MessageRepository:
                     "file_type": row.get('file_type'),
                     "file_size": row.get('file_size')
                 }
-                for row in result.data
+                for row in rows
             ]
         return []
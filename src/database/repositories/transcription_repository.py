@@ -1,9 +1,12 @@
 from uuid import UUID
-from typing import Optional
+from typing import Optional, Iterable, Dict
 from datetime import datetime
 from src.database.connection import db
 from src.database.models import Transcription
 
+# IDs per in_ filter - it travels in the GET query string (~37 bytes per UUID), so keep URLs short
+_IN_FILTER_BATCH = 100
+
 class TranscriptionRepository:
     """Repository for managing transcriptions using Supabase SDK"""
     
@@ -33,10 +36,32 @@ class TranscriptionRepository:
         ).execute()
         
         if result.data and len(result.data) > 0:
-            row = result.data[0]
-            return Transcription(
-                transcription_id=UUID(row['transcription_id']),
-                content=row['content'],
-                created_at=datetime.fromisoformat(row['created_at'].replace('Z', '+00:00'))
-            )
+            return self._row_to_transcription(result.data[0])
         return None
+    
+    def get_many(self, transcription_ids: Iterable[UUID]) -> Dict[UUID, Transcription]:
+        """Get several transcriptions in one query per 100 IDs (duplicate IDs are fetched once)"""
+        ids = list({str(transcription_id) for transcription_id in transcription_ids})
+        if not ids:
+            return {}
+        
+        client = db.get_client()
+        
+        transcriptions = {}
+        for start in range(0, len(ids), _IN_FILTER_BATCH):
+            result = client.table('transcriptions').select('*').in_(
+                'transcription_id', ids[start:start + _IN_FILTER_BATCH]
+            ).execute()
+            
+            for row in result.data or []:
+                transcription = self._row_to_transcription(row)
+                transcriptions[transcription.transcription_id] = transcription
+        return transcriptions
+    
+    def _row_to_transcription(self, row: dict) -> Transcription:
+        """Convert database row to Transcription model"""
+        return Transcription(
+            transcription_id=UUID(row['transcription_id']),
+            content=row['content'],
+            created_at=datetime.fromisoformat(row['created_at'].replace('Z', '+00:00'))
+        )
@@ -84,7 +84,7 @@ class CommandHandler:
         sender = await event.get_sender()
         user_id = sender.id
         
-        user_contexts = self.context_repo.get(user_id)
+        user_contexts = await self.context_repo.get(user_id)
         
         if not user_contexts or not user_contexts.contexts:
             await event.reply(
@@ -136,7 +136,7 @@ class CommandHandler:
             return
         
         index = int(args.strip())
-        user_contexts = self.context_repo.get(user_id)
+        user_contexts = await self.context_repo.get(user_id)
         
         if not user_contexts:
             await event.reply("❌ Chưa có conversation nào!")
@@ -149,7 +149,7 @@ class CommandHandler:
             return
         
         # Switch context
-        self.context_repo.switch_context(user_id, context.id)
+        self.context_repo.switch_context(user_id, context.uuid)
         
         # Show confirmation with preview
         lines = [
@@ -194,7 +194,7 @@ class CommandHandler:
             return
         
         index = int(args.strip())
-        user_contexts = self.context_repo.get(user_id)
+        user_contexts = await self.context_repo.get(user_id)
         
         if not user_contexts:
             await event.reply("❌ Chưa có conversation nào!")
@@ -209,7 +209,7 @@ class CommandHandler:
         title = context.title
         
         # Delete context
-        if self.context_repo.delete_context(user_id, context.id):
+        if self.context_repo.delete_context(user_id, context.uuid):
             await event.reply(f"✅ Đã xóa: {truncate_with_ellipsis(title, 35)}")
         else:
             await event.reply("❌ Lỗi khi xóa conversation")
@@ -219,7 +219,7 @@ class CommandHandler:
         sender = await event.get_sender()
         user_id = sender.id
         
-        user_contexts = self.context_repo.get(user_id)
+        user_contexts = await self.context_repo.get(user_id)
         
         if not user_contexts or not user_contexts.active_context_id:
             await event.reply("📚 Chưa có conversation nào đang active.\n\nGửi audio/video để bắt đầu!")
@@ -11,12 +11,25 @@ from src.database.repositories.conversation_repository import ConversationReposi
 from src.database.repositories.transcription_repository import TranscriptionRepository
 from src.database.repositories.message_repository import MessageRepository
 from src.core.context import MediaContext
-from src.utils.media_detector import is_photo, is_voice_or_audio, is_video
+from src.utils.media_detector import classify_media, MediaKind
 from src.utils.url_parser import extract_video_url
 from src.utils.message_splitter import send_long_message
 from src.utils.formatters import truncate_with_ellipsis
 from src.config import MAX_MESSAGE_LENGTH
 
+# File extension for unnamed media, by mime type
+_MIME_EXTS = {
+    'video/mp4': '.mp4',
+    'video/quicktime': '.mov',
+    'video/x-matroska': '.mkv',
+    'video/webm': '.webm',
+    'video/avi': '.avi',
+    'audio/mpeg': '.mp3',
+    'audio/mp4': '.m4a',
+    'audio/ogg': '.oga',
+    'audio/wav': '.wav',
+}
+
 class MessageHandler:
     def __init__(self, client, user_repo: UserRepository, context_repo: ContextRepository,
                  media_service: MediaService, ai_service: AIService):
@@ -51,8 +64,12 @@ class MessageHandler:
             new_filename = f"{user_id}_{timestamp}{file_ext}"
             new_path = os.path.join(self.audio_dir, new_filename)
             
-            # Move file to media/audio
-            shutil.move(audio_path, new_path)
+            # Move file to media/audio - atomic rename when on the same filesystem,
+            # downloads in a tmpfs temp dir fall back to copy (sendfile) + unlink
+            try:
+                os.replace(audio_path, new_path)
+            except OSError:
+                shutil.move(audio_path, new_path)
             print(f"📦 Moved audio file to: {new_path}")
             return new_path
         except Exception as e:
@@ -62,6 +79,27 @@ class MessageHandler:
                 os.remove(audio_path)
             return None
     
+    @staticmethod
+    def _chunk_progress(status_msg):
+        """
+        on_chunk callback for long audio - shows how many parts are transcribed in the status message.
+        Chunks often finish in bursts, so edits are throttled to one per 2 seconds (plus the last part)
+        to stay clear of Telegram FloodWait, which would stall the chunk pipeline.
+        """
+        last_edit = {'time': 0.0, 'text': None}
+        
+        async def on_chunk(index: int, total: int, text):
+            progress_text = f"⏳ Transcribing audio... ({index}/{total} parts done)"
+            now = time.monotonic()
+            if progress_text == last_edit['text']:
+                return
+            if index != total and now - last_edit['time'] < 2.0:
+                return
+            last_edit['time'] = now
+            last_edit['text'] = progress_text
+            await status_msg.edit(progress_text)
+        return on_chunk
+    
     def _cleanup_audio_file(self, audio_path: str):
         """Delete audio file"""
         try:
@@ -105,19 +143,7 @@ class MessageHandler:
                     if message.file.name:
                         file_ext = os.path.splitext(message.file.name)[1] or '.mp4'
                     elif message.file.mime_type:
-                        # Common video mime types
-                        mime_map = {
-                            'video/mp4': '.mp4',
-                            'video/quicktime': '.mov',
-                            'video/x-matroska': '.mkv',
-                            'video/webm': '.webm',
-                            'video/avi': '.avi',
-                            'audio/mpeg': '.mp3',
-                            'audio/mp4': '.m4a',
-                            'audio/ogg': '.oga',
-                            'audio/wav': '.wav',
-                        }
-                        file_ext = mime_map.get(message.file.mime_type, '.mp4')
+                        file_ext = _MIME_EXTS.get(message.file.mime_type, '.mp4')
                 
                 file_path = f"temp_media_{message.id}_{timestamp}{file_ext}"
             
@@ -217,7 +243,7 @@ class MessageHandler:
         # Create MediaContext for compatibility
         context = MediaContext(
             user_id=user_id,
-            context_id=str(conversation_id),
+            context_id=conversation_id,
             transcription=transcribed_text,
             title=metadata.title,
             summary=metadata.summary,
@@ -273,7 +299,7 @@ class MessageHandler:
         active_context = self.context_repo.get_active_context(user_id)
         
         if active_context:
-            conversation_id = active_context.id
+            conversation_id = active_context.uuid
             ai_response = await self.ai_service.get_response(
                 user_text, 
                 active_context.transcription, 
@@ -294,10 +320,9 @@ class MessageHandler:
                         caption=f"📄 Full Transcription\n\n{active_context.title}"
                     )
                     # Save messages to database
-                    from uuid import UUID
-                    self.message_repo.add_message(UUID(conversation_id), 'user', user_text)
-                    self.message_repo.add_message(UUID(conversation_id), 'assistant', "[Sent full transcription file]")
-                    self.conversation_repo.update_conversation(UUID(conversation_id))
+                    self.message_repo.add_message(conversation_id, 'user', user_text)
+                    self.message_repo.add_message(conversation_id, 'assistant', "[Sent full transcription file]")
+                    self.conversation_repo.update_conversation(conversation_id)
                 else:
                     # Regular transcript, send as chunked messages
                     await send_long_message(
@@ -306,16 +331,14 @@ class MessageHandler:
                         prefix="📄 **Full Transcription** (continued)\n\n"
                     )
                     # Save messages to database
-                    from uuid import UUID
-                    self.message_repo.add_message(UUID(conversation_id), 'user', user_text)
-                    self.message_repo.add_message(UUID(conversation_id), 'assistant', "[Returned full transcription]")
-                    self.conversation_repo.update_conversation(UUID(conversation_id))
+                    self.message_repo.add_message(conversation_id, 'user', user_text)
+                    self.message_repo.add_message(conversation_id, 'assistant', "[Returned full transcription]")
+                    self.conversation_repo.update_conversation(conversation_id)
             elif ai_response:
                 # Save messages to database
-                from uuid import UUID
-                self.message_repo.add_message(UUID(conversation_id), 'user', user_text)
-                self.message_repo.add_message(UUID(conversation_id), 'assistant', ai_response)
-                self.conversation_repo.update_conversation(UUID(conversation_id))
+                self.message_repo.add_message(conversation_id, 'user', user_text)
+                self.message_repo.add_message(conversation_id, 'assistant', ai_response)
+                self.conversation_repo.update_conversation(conversation_id)
                 await send_long_message(event, ai_response)
         else:
             # No active context, general chat
@@ -363,14 +386,15 @@ class MessageHandler:
             
             # Handle media
             if event.message.media:
-                if is_photo(event.message.media):
+                media_kind = classify_media(event.message.media)
+                if media_kind is MediaKind.PHOTO:
                     if video_url:
                         # Process video link from text
                         status_msg = await event.reply("⏳ Downloading and transcribing video...")
                         audio_path = await self.media_service.download_video_audio(video_url)
                         if audio_path:
                             await status_msg.edit("⏳ Transcribing audio...")
-                            transcribed = await self.media_service.transcribe_audio(audio_path)
+                            transcribed = await self.media_service.transcribe_audio(audio_path, self._chunk_progress(status_msg))
                             
                             # Get duration before removing file
                             duration = 0
@@ -411,7 +435,7 @@ class MessageHandler:
                     audio_path = await self.media_service.download_video_audio(video_url)
                     if audio_path:
                         await status_msg.edit("⏳ Transcribing audio...")
-                        transcribed = await self.media_service.transcribe_audio(audio_path)
+                        transcribed = await self.media_service.transcribe_audio(audio_path, self._chunk_progress(status_msg))
                         
                         # Get duration
                         duration = 0
@@ -443,7 +467,7 @@ class MessageHandler:
                     return
                 
                 # Process voice message or audio file
-                if is_voice_or_audio(event.message.media):
+                if media_kind is MediaKind.AUDIO:
                     print(f"🎤 Phát hiện voice/audio message")
                     status_msg = await event.reply("⏳ Downloading audio...")
                     path = await self._fast_download_media(event.message)
@@ -451,7 +475,7 @@ class MessageHandler:
                     
                     if path:
                         await status_msg.edit("⏳ Transcribing audio...")
-                        transcribed = await self.media_service.transcribe_audio(path)
+                        transcribed = await self.media_service.transcribe_audio(path, self._chunk_progress(status_msg))
                         
                         # Get duration
                         duration = 0
@@ -496,55 +520,37 @@ class MessageHandler:
                     return
                 
                 # Process video file
-                if is_video(event.message.media):
+                if media_kind is MediaKind.VIDEO:
                     print(f"🎬 Phát hiện video file")
                     status_msg = await event.reply("⏳ Downloading video...")
                     video_path = await self._fast_download_media(event.message)
                     print(f"📁 Downloaded video to: {video_path}")
                     
                     if video_path:
-                        await status_msg.edit("⏳ Extracting audio from video...")
-                        audio_path = await self.media_service.extract_audio_from_video(video_path)
+                        await status_msg.edit("⏳ Transcribing video audio...")
+                        # Audio is streamed out of the video - no intermediate audio file for short videos
+                        # Duration is read by the service (ffprobe fallback covers MKV/WebM/AVI)
+                        transcribed, duration = await self.media_service.transcribe_video(video_path, self._chunk_progress(status_msg))
                         
-                        if audio_path:
-                            await status_msg.edit("⏳ Transcribing audio...")
-                            transcribed = await self.media_service.transcribe_audio(audio_path)
-                            
-                            # Get duration
-                            duration = 0
-                            try:
-                                import mutagen
-                                audio_info = mutagen.File(audio_path)
-                                if audio_info:
-                                    duration = int(audio_info.info.length)
-                            except:
-                                pass
-                            
-                            # Clean up video and audio files
-                            self._cleanup_audio_file(video_path)
-                            self._cleanup_audio_file(audio_path)
-                            
-                            if transcribed:
-                                print(f"✅ Transcribed video successfully, processing...")
-                                await status_msg.delete()
-                                # Only process with AI if there's user text (caption)
-                                # Video without caption → just transcribe
-                                # Video with caption → transcribe + process caption with AI
-                                await self._process_media(
-                                    event, user_id, transcribed, 
-                                    user_text or None,
-                                    source_type="video_file",
-                                    duration_seconds=duration,
-                                    process_with_ai=bool(user_text)
-                                )
-                            else:
-                                print(f"❌ Video transcription failed")
-                                await status_msg.edit("❌ Failed to transcribe video audio")
+                        # Clean up video file
+                        self._cleanup_audio_file(video_path)
+                        
+                        if transcribed:
+                            print(f"✅ Transcribed video successfully, processing...")
+                            await status_msg.delete()
+                            # Only process with AI if there's user text (caption)
+                            # Video without caption → just transcribe
+                            # Video with caption → transcribe + process caption with AI
+                            await self._process_media(
+                                event, user_id, transcribed, 
+                                user_text or None,
+                                source_type="video_file",
+                                duration_seconds=duration,
+                                process_with_ai=bool(user_text)
+                            )
                         else:
-                            print(f"❌ Audio extraction failed")
-                            # Clean up video file
-                            self._cleanup_audio_file(video_path)
-                            await status_msg.edit("❌ Failed to extract audio from video")
+                            print(f"❌ Video transcription failed")
+                            await status_msg.edit("❌ Failed to transcribe video audio")
                     else:
                         print(f"❌ Video download failed")
                         await status_msg.edit("❌ Failed to download video")
@@ -562,7 +568,7 @@ class MessageHandler:
                     audio_path = await self.media_service.download_video_audio(video_url)
                     if audio_path:
                         await status_msg.edit("⏳ Transcribing audio...")
-                        transcribed = await self.media_service.transcribe_audio(audio_path)
+                        transcribed = await self.media_service.transcribe_audio(audio_path, self._chunk_progress(status_msg))
                         
                         # Get duration
                         duration = 0
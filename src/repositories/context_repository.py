@@ -1,9 +1,12 @@
-from typing import Optional, List
+import asyncio
+from typing import Optional, List, Dict, Union
 from uuid import UUID
 from src.database.repositories.conversation_repository import ConversationRepository
 from src.database.repositories.transcription_repository import TranscriptionRepository
 from src.database.repositories.message_repository import MessageRepository
-from src.core.context import MediaContext, UserContexts
+from src.database.models import Conversation
+from src.core.context import MediaContext, UserContexts, parse_context_id
+from src.config import MAX_HISTORY_TURNS
 
 class ContextRepository:
     """Context repository using database - maintains compatibility with old interface"""
@@ -12,10 +15,14 @@ class ContextRepository:
         self.conversation_repo = ConversationRepository()
         self.transcription_repo = TranscriptionRepository()
         self.message_repo = MessageRepository()
+        
+        # user_id -> active conversation id, written through on switch/add so the
+        # next get_active_context can go straight to a primary-key lookup
+        self._active_id_cache: Dict[str, UUID] = {}
     
-    def get(self, user_id: int) -> Optional[UserContexts]:
+    async def get(self, user_id: int) -> Optional[UserContexts]:
         """Load all contexts for user (for compatibility)"""
-        conversations = self.conversation_repo.get_user_conversations(str(user_id))
+        conversations = await asyncio.to_thread(self.conversation_repo.get_user_conversations, str(user_id))
         if not conversations:
             return None
         
@@ -26,29 +33,24 @@ class ContextRepository:
                 active_id = conv.id
                 break
         
-        # Convert to MediaContext format
+        # One batched query for all transcriptions (shared IDs fetched once),
+        # histories loaded concurrently - each one is independent
+        transcriptions, histories = await asyncio.gather(
+            asyncio.to_thread(
+                self.transcription_repo.get_many,
+                [conv.transcription_id for conv in conversations]
+            ),
+            asyncio.gather(*[
+                asyncio.to_thread(self.message_repo.get_conversation_history, conv.id)
+                for conv in conversations
+            ])
+        )
+        
         contexts = []
-        for conv in conversations:
-            # Get transcription content
-            transcription = self.transcription_repo.get_transcription_by_id(conv.transcription_id)
+        for conv, history in zip(conversations, histories):
+            transcription = transcriptions.get(conv.transcription_id)
             transcription_text = transcription.content if transcription else ""
-            
-            # Get history
-            history = self.message_repo.get_conversation_history(conv.id)
-            
-            # Convert to MediaContext
-            context = MediaContext(
-                user_id=int(conv.user_id),
-                context_id=str(conv.id),
-                transcription=transcription_text,
-                title=conv.title or "",
-                summary=conv.metadata.get('summary', '') if conv.metadata else '',
-                duration_seconds=conv.metadata.get('duration_seconds', 0) if conv.metadata else 0,
-                source_type=conv.source_type,
-                transcript_file_path=conv.metadata.get('transcript_file_path') if conv.metadata else None,
-                history=history
-            )
-            contexts.append(context)
+            contexts.append(self._build_media_context(conv, transcription_text, history))
         
         return UserContexts(
             user_id=user_id,
@@ -56,14 +58,29 @@ class ContextRepository:
             active_context_id=str(active_id) if active_id else None
         )
     
+    def _build_media_context(self, conv: Conversation, transcription_text: str, history: List[Dict]) -> MediaContext:
+        """Convert conversation row + loaded content to MediaContext"""
+        metadata = conv.metadata or {}
+        return MediaContext(
+            user_id=int(conv.user_id),
+            context_id=conv.id,
+            transcription=transcription_text,
+            title=conv.title or "",
+            summary=metadata.get('summary', ''),
+            duration_seconds=metadata.get('duration_seconds', 0),
+            source_type=conv.source_type,
+            transcript_file_path=metadata.get('transcript_file_path'),
+            history=history
+        )
+    
     def save(self, user_contexts: UserContexts):
         """Save all contexts for user (for compatibility)"""
         # This is handled by individual add/update operations
         pass
     
-    def get_active_context(self, user_id: int) -> Optional[MediaContext]:
-        """Get active context for user"""
-        conversation = self.conversation_repo.get_active_conversation(str(user_id))
+    def get_active_context(self, user_id: int, history_limit: Optional[int] = MAX_HISTORY_TURNS) -> Optional[MediaContext]:
+        """Get active context for user (history trimmed to the last `history_limit` turns, None = all)"""
+        conversation = self._get_active_conversation(str(user_id))
         if not conversation:
             return None
         
@@ -71,25 +88,31 @@ class ContextRepository:
         transcription = self.transcription_repo.get_transcription_by_id(conversation.transcription_id)
         transcription_text = transcription.content if transcription else ""
         
-        # Get history
-        history = self.message_repo.get_conversation_history(conversation.id)
-        
-        return MediaContext(
-            user_id=int(conversation.user_id),
-            context_id=str(conversation.id),
-            transcription=transcription_text,
-            title=conversation.title or "",
-            summary=conversation.metadata.get('summary', '') if conversation.metadata else '',
-            duration_seconds=conversation.metadata.get('duration_seconds', 0) if conversation.metadata else 0,
-            source_type=conversation.source_type,
-            transcript_file_path=conversation.metadata.get('transcript_file_path') if conversation.metadata else None,
-            history=history
+        # Get recent history (one turn = user message + assistant reply)
+        history = self.message_repo.get_conversation_history(
+            conversation.id,
+            limit=history_limit * 2 if history_limit else None
         )
+        
+        return self._build_media_context(conversation, transcription_text, history)
+    
+    def _get_active_conversation(self, user_id: str) -> Optional[Conversation]:
+        """Get active conversation, using the cached id when it is still valid"""
+        cached_id = self._active_id_cache.get(user_id)
+        if cached_id:
+            conversation = self.conversation_repo.get_conversation_by_id(cached_id)
+            # Conversations can be created/activated elsewhere (handlers, API) - verify before trusting
+            if conversation and conversation.user_id == user_id and conversation.is_active:
+                return conversation
+            self._active_id_cache.pop(user_id, None)
+        
+        conversation = self.conversation_repo.get_active_conversation(user_id)
+        if conversation:
+            self._active_id_cache[user_id] = conversation.id
+        return conversation
     
     def add_context(self, user_id: int, context: MediaContext):
         """Add new context for user"""
-        from uuid import UUID as UUIDType
-        
         # Create transcription first
         transcription_id = self.transcription_repo.create_transcription(context.transcription)
         
@@ -109,34 +132,41 @@ class ContextRepository:
             platform='telegram',  # Will be set by handler
             metadata=metadata,
             source_type=context.source_type,
-            conversation_id=UUIDType(context.id) if context.id else None
+            conversation_id=context.uuid
         )
+        self._active_id_cache[str(user_id)] = conversation_id
         
         print(f"✅ Đã thêm context mới: {context.title}")
     
     def update_context(self, user_id: int, context: MediaContext):
         """Update existing context"""
         # Update conversation updated_at
-        self.conversation_repo.update_conversation(UUID(context.id))
+        self.conversation_repo.update_conversation(context.uuid)
     
-    def switch_context(self, user_id: int, context_id: str) -> bool:
+    def switch_context(self, user_id: int, context_id: Union[str, UUID]) -> bool:
         """Switch active context"""
-        return self.conversation_repo.set_active_conversation(str(user_id), UUID(context_id))
+        conversation_id = parse_context_id(context_id)
+        if not self.conversation_repo.set_active_conversation(str(user_id), conversation_id):
+            return False
+        self._active_id_cache[str(user_id)] = conversation_id
+        return True
     
-    def delete_context(self, user_id: int, context_id: str) -> bool:
+    def delete_context(self, user_id: int, context_id: Union[str, UUID]) -> bool:
         """Delete a context"""
-        return self.conversation_repo.delete_conversation(str(user_id), UUID(context_id))
+        self._active_id_cache.pop(str(user_id), None)
+        return self.conversation_repo.delete_conversation(str(user_id), parse_context_id(context_id))
     
     def delete(self, user_id: int):
         """Delete all contexts for user"""
+        self._active_id_cache.pop(str(user_id), None)
         conversations = self.conversation_repo.get_user_conversations(str(user_id))
         for conv in conversations:
             self.conversation_repo.delete_conversation(str(user_id), conv.id)
         print(f"🗑️ Đã xóa tất cả contexts của user {user_id}")
     
-    def get_context_by_id(self, user_id: int, context_id: str) -> Optional[MediaContext]:
+    def get_context_by_id(self, user_id: int, context_id: Union[str, UUID]) -> Optional[MediaContext]:
         """Get context by ID"""
-        conversation = self.conversation_repo.get_conversation_by_id(UUID(context_id))
+        conversation = self.conversation_repo.get_conversation_by_id(parse_context_id(context_id))
         if not conversation or conversation.user_id != str(user_id):
             return None
         
@@ -147,18 +177,8 @@ class ContextRepository:
         # Get history
         history = self.message_repo.get_conversation_history(conversation.id)
         
-        return MediaContext(
-            user_id=int(conversation.user_id),
-            context_id=str(conversation.id),
-            transcription=transcription_text,
-            title=conversation.title or "",
-            summary=conversation.metadata.get('summary', '') if conversation.metadata else '',
-            duration_seconds=conversation.metadata.get('duration_seconds', 0) if conversation.metadata else 0,
-            source_type=conversation.source_type,
-            transcript_file_path=conversation.metadata.get('transcript_file_path') if conversation.metadata else None,
-            history=history
-        )
+        return self._build_media_context(conversation, transcription_text, history)
     
-    def get_user_contexts(self, user_id: int):
+    async def get_user_contexts(self, user_id: int):
         """Get user contexts (alias for get)"""
-        return self.get(user_id)
+        return await self.get(user_id)
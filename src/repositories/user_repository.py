@@ -1,4 +1,5 @@
 from typing import Optional, Union
+from cachetools import TTLCache
 from src.core.user import User
 from src.database.repositories.user_profile_repository import UserProfileRepository
 
@@ -7,10 +8,21 @@ class UserRepository:
     
     def __init__(self):
         self.profile_repo = UserProfileRepository()
+        # exists() runs on every incoming message - remember users we've already seen.
+        # Only positive results are cached so a user registered by another process
+        # (bot vs API) is picked up immediately.
+        self._exists_cache: TTLCache = TTLCache(maxsize=10000, ttl=600)
     
     def exists(self, user_id: Union[int, str]) -> bool:
         """Check if user exists - accepts both int (Telegram) and str (Mobile UUID)"""
-        return self.profile_repo.user_exists(str(user_id))
+        key = str(user_id)
+        if key in self._exists_cache:
+            return True
+        
+        result = self.profile_repo.user_exists(key)
+        if result:
+            self._exists_cache[key] = True
+        return result
     
     def get(self, user_id: int) -> Optional[User]:
         """Get user by ID"""
@@ -38,17 +50,15 @@ class UserRepository:
             first_name=first_name,
             last_name=last_name
         )
+        self._exists_cache[str(user.user_id)] = True
     
     def add_user(self, user_id: Union[int, str]):
         """Add a new user - accepts both int (Telegram) and str (Mobile UUID)"""
-        # For mobile (string UUID), just create profile directly without User object
-        if isinstance(user_id, str):
-            self.profile_repo.create_or_update_user_profile(
-                user_id=user_id,
-                first_name=None,
-                last_name=None
-            )
-        else:
-            # For telegram (int), use User object
-            user = User(user_id=user_id)
-            self.save(user)
+        # No name is known at this point, so upsert the profile directly
+        key = str(user_id)
+        self.profile_repo.create_or_update_user_profile(
+            user_id=key,
+            first_name=None,
+            last_name=None
+        )
+        self._exists_cache[key] = True
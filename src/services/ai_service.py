@@ -1,16 +1,31 @@
 from typing import Optional, List, Dict
 from src.clients.openrouter_api import OpenRouterAPI
 from src.utils.schemas import ContextMetadata, GetTranscriptionTool
+from src.config import MAX_HISTORY_TURNS
 from datetime import datetime
-import json
+import itertools
+import re
+import orjson
+
+# Compact spec for the metadata prompt - the full Pydantic JSON schema ($defs, titles,
+# type descriptors) costs ~10x the tokens for the same information.
+# Keep in sync with ContextMetadata limits.
+_METADATA_SPEC = '{"title": "string, <=35 chars", "summary": "string, <=80 chars, comma-separated keywords"}'
+
+# Transcript excerpt for metadata: ~300 tokens at the usual ~4 chars/token
+_METADATA_EXCERPT_TOKENS = 300
+_METADATA_EXCERPT_CHARS = _METADATA_EXCERPT_TOKENS * 4
+
+_WORD_RE = re.compile(r"\S+")
 
 class AIService:
     def __init__(self):
         self.api = OpenRouterAPI()
     
     async def get_response(self, text: str, transcription: Optional[str] = None, 
-                          history: Optional[List[Dict]] = None) -> Optional[str]:
-        """Get AI response with function calling support"""
+                          history: Optional[List[Dict]] = None,
+                          history_limit: Optional[int] = MAX_HISTORY_TURNS) -> Optional[str]:
+        """Get AI response with function calling support (only the last `history_limit` turns are sent)"""
         messages = []
         
         # Ensure transcription is a string, not None
@@ -40,6 +55,8 @@ Available Tool:
             })
         
         if history:
+            if history_limit and len(history) > history_limit * 2:
+                history = history[-history_limit * 2:]
             messages.extend(history)
         
         messages.append({"role": "user", "content": text})
@@ -62,9 +79,6 @@ Available Tool:
     async def generate_metadata(self, transcription: str) -> ContextMetadata:
         """Generate title and summary using structured output with schema validation"""
         
-        # Get JSON schema from Pydantic model
-        schema = ContextMetadata.model_json_schema()
-        
         system_prompt = """You are a metadata generator for audio/video transcriptions.
 You MUST return ONLY valid JSON matching the provided schema.
 No other text, no markdown, just pure JSON.
@@ -74,12 +88,18 @@ Guidelines:
 - summary: Keywords separated by commas (max 80 chars)
 """
 
+        # Short transcripts are passed as-is, only long ones get sliced
+        if len(transcription) > _METADATA_EXCERPT_CHARS:
+            excerpt = transcription[:_METADATA_EXCERPT_CHARS] + "..."
+        else:
+            excerpt = transcription
+        
         user_prompt = f"""Analyze this transcript and generate metadata:
 
-{transcription[:1200]}...
+{excerpt}
 
 Schema:
-{json.dumps(schema, indent=2)}
+{_METADATA_SPEC}
 
 Return JSON:"""
 
@@ -102,22 +122,22 @@ Return JSON:"""
                     clean = clean[4:].strip()
             
             # Parse and validate with Pydantic
-            data = json.loads(clean)
+            data = orjson.loads(clean)
             metadata = ContextMetadata(**data)
             
             print(f"✅ Generated metadata: {metadata.title}")
             return metadata
             
-        except (json.JSONDecodeError, ValueError, Exception) as e:
+        except (orjson.JSONDecodeError, ValueError, Exception) as e:
             print(f"⚠️ Metadata generation failed: {e}, using fallback")
             # Fallback to simple metadata
             return self._generate_fallback_metadata(transcription)
     
     def _generate_fallback_metadata(self, transcription: str) -> ContextMetadata:
         """Generate simple fallback metadata without AI"""
-        # Extract first meaningful words for title
-        words = transcription.split()[:6]
-        title = " ".join(words)
+        # Extract first meaningful words for title (stop scanning after 6 words)
+        words = itertools.islice(_WORD_RE.finditer(transcription), 6)
+        title = " ".join(m.group() for m in words)
         if len(title) > 35:
             title = title[:32] + "..."
         
@@ -1,13 +1,29 @@
 import os
+import re
+import sys
+import atexit
+import shutil
+import math
+import tempfile
+import logging
+import threading
 import base64
-import subprocess
+import hashlib
 import asyncio
+import functools
+import time
 import yt_dlp
-import requests
+import httpx
+import aiofiles
+from mutagen import File as MutagenFile
 from yt_dlp import DownloadError
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, AsyncIterator, List, Iterable, Dict, Callable, Awaitable
+from uuid import uuid4
 from src.clients.openrouter_api import OpenRouterAPI
-from src.config import MAX_FILE_SIZE_MB
+from src.config import (
+    MAX_FILE_SIZE_MB, AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_MB, TRANSCRIBE_TMPFS_DIR, MAX_CONCURRENT_TRANSCRIPTIONS
+)
 
 # Try importing pytubefix as fallback
 try:
@@ -17,14 +33,213 @@ except ImportError:
     PYTUBEFIX_AVAILABLE = False
     print("⚠️ pytubefix not available - will only use yt-dlp")
 
+logger = logging.getLogger(__name__)
+
+class _ConcurrencyLimiter:
+    """Counter guarded by an asyncio.Condition - unlike a Semaphore the limit can change while calls are in flight"""
+    
+    def __init__(self, max_active: int):
+        self.max_active = max(1, max_active)
+        self.active = 0
+        self._cond = asyncio.Condition()
+    
+    async def __aenter__(self):
+        async with self._cond:
+            while self.active >= self.max_active:
+                await self._cond.wait()
+            self.active += 1
+    
+    async def __aexit__(self, *exc_info):
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify(1)
+    
+    async def set_max(self, max_active: int):
+        """Change the limit; waiters re-check immediately when it is raised"""
+        async with self._cond:
+            self.max_active = max(1, max_active)
+            self._cond.notify_all()
+
+# Process-wide cap on transcription API calls (shared by all users and chunks)
+_transcription_limiter = _ConcurrencyLimiter(MAX_CONCURRENT_TRANSCRIPTIONS)
+
+async def set_max_concurrent_transcriptions(max_active: int):
+    """Adjust the transcription concurrency cap at runtime (e.g. back off after 429s)"""
+    await _transcription_limiter.set_max(max_active)
+
+# on_chunk(index, total, text) - called in chunk order as soon as each prefix of chunks is transcribed (text is None on failure)
+ChunkCallback = Callable[[int, int, Optional[str]], Awaitable[None]]
+
+def _chunk_temp_root(needed_bytes: int) -> str:
+    """
+    Directory for one job's chunk files. The RAM-backed TRANSCRIBE_TMPFS_DIR is only used when set
+    explicitly and it has room for the job (Docker's default /dev/shm is 64 MB) - else the system temp dir.
+    """
+    if TRANSCRIBE_TMPFS_DIR:
+        try:
+            if shutil.disk_usage(TRANSCRIBE_TMPFS_DIR).free > needed_bytes:
+                return TRANSCRIBE_TMPFS_DIR
+            print(f"⚠️ Not enough space in {TRANSCRIBE_TMPFS_DIR} for chunks, using {tempfile.gettempdir()}")
+        except OSError as e:
+            print(f"⚠️ Cannot use {TRANSCRIBE_TMPFS_DIR} for chunks ({e}), using {tempfile.gettempdir()}")
+    return tempfile.gettempdir()
+
+# One chunk directory per temp root per process, reused by every chunking job (files carry a per-job prefix)
+_temp_pools: Dict[str, str] = {}
+
+def _temp_pool(root: str) -> str:
+    """Pool directory under root - created on first use, removed at exit"""
+    pool = _temp_pools.get(root)
+    if pool is None or not os.path.isdir(pool):
+        pool = tempfile.mkdtemp(prefix='transcribe_pool_', dir=root)
+        atexit.register(shutil.rmtree, pool, ignore_errors=True)
+        _temp_pools[root] = pool
+    return pool
+
+# Audio codecs that can be stream-copied (-c copy) into chunks with each container extension
+_COPY_SAFE_CODECS = {
+    '.mp3': frozenset({'mp3'}),
+    '.m4a': frozenset({'aac', 'mp3', 'alac'}),
+    '.mp4': frozenset({'aac', 'mp3'}),
+    '.aac': frozenset({'aac'}),
+    '.ogg': frozenset({'vorbis', 'opus', 'flac'}),
+    '.oga': frozenset({'vorbis', 'opus', 'flac'}),
+    '.opus': frozenset({'opus'}),
+    '.webm': frozenset({'opus', 'vorbis'}),
+    '.flac': frozenset({'flac'}),
+}
+
+# Bitrate of re-encoded chunks (libmp3lame, 16 kHz mono)
+_REENCODE_BITRATE_BPS = 64000
+
+# Player-client race probes give up quickly - a cancelled race can't stop its worker thread
+_RACE_PROBE_OPTS = {'socket_timeout': 10, 'retries': 1, 'extractor_retries': 1}
+
+# YouTube video ID in watch / short-link / shorts / embed / live URLs
+_YOUTUBE_ID_RE = re.compile(r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/)|youtu\.be/)([A-Za-z0-9_-]{11})')
+
 class MediaService:
+    # Tool availability doesn't change while the process runs - checked once per process
+    _ffmpeg_available: Optional[bool] = None
+    _aria2c_available: Optional[bool] = None
+    _aria2c_version: Optional[Tuple[int, ...]] = None
+    
     def __init__(self):
         self.api = OpenRouterAPI()
+        
+        # Shared keep-alive pool - repeated downloads from the same storage host reuse connections
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=60.0,
+            follow_redirects=True,
+            http2=True
+        )
+        
+        # yt-dlp is fully blocking - run it off the event loop, bounded so a burst of
+        # links doesn't spawn dozens of extractors (each fanning out aria2c connections)
+        self._ydl_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ytdlp")
+        # Player-client races get their own workers so losing clients don't hold up downloads
+        self._race_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="ytdlp-race")
+        
+        # YoutubeDL instances are reused per worker thread (they are not thread-safe)
+        self._ydl_local = threading.local()
+        self._ydl_instances: List[yt_dlp.YoutubeDL] = []
+        self._ydl_instances_lock = threading.Lock()
+        self._progress_last_log: Dict[str, float] = {}
+    
+    async def aclose(self):
+        """Release pooled HTTP connections, worker threads and yt-dlp instances (call on shutdown)"""
+        await self._http.aclose()
+        self._ydl_executor.shutdown(wait=False, cancel_futures=True)
+        self._race_executor.shutdown(wait=False, cancel_futures=True)
+        with self._ydl_instances_lock:
+            for ydl in self._ydl_instances:
+                ydl.__exit__(None, None, None)
+            self._ydl_instances.clear()
+    
+    async def _run_ydl(self, func, *args, executor: Optional[ThreadPoolExecutor] = None):
+        """Run a blocking yt-dlp call on the dedicated executor (or the given one)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor or self._ydl_executor, functools.partial(func, *args))
+    
+    def _get_ydl(self, variant: str, ydl_opts: dict) -> yt_dlp.YoutubeDL:
+        """
+        Cached YoutubeDL for this worker thread and option variant (building one registers every
+        extractor). Only the output template is swapped per call - other options must not change per variant.
+        """
+        instances = self._ydl_local.__dict__.setdefault('instances', {})
+        ydl = instances.get(variant)
+        if ydl is None:
+            ydl = yt_dlp.YoutubeDL({**ydl_opts, 'progress_hooks': [self._progress_hook]})
+            instances[variant] = ydl
+            with self._ydl_instances_lock:
+                self._ydl_instances.append(ydl)
+        ydl.params['outtmpl']['default'] = ydl_opts['outtmpl']
+        return ydl
+    
+    def _progress_hook(self, d: dict):
+        """yt-dlp progress hook - fires on every downloaded block, so progress is logged at most once per second per file"""
+        filename = d.get('filename', '')
+        if d['status'] == 'error':
+            logger.error("Download error: %s", d.get('error', 'Unknown error'))
+            self._progress_last_log.pop(filename, None)
+        elif d['status'] == 'finished':
+            self._progress_last_log.pop(filename, None)
+        elif d['status'] == 'downloading':
+            if 'total_bytes' in d:
+                percent = d.get('downloaded_bytes', 0) / d['total_bytes'] * 100
+                now = time.monotonic()
+                if now - self._progress_last_log.get(filename, 0.0) >= 1.0 or percent >= 100:
+                    self._progress_last_log[filename] = now
+                    logger.info("Downloading: %.1f%%", percent)
+    
+    def _ydl_extract_and_download(self, url: str, variant: str, ydl_opts: dict, client_desc: Optional[str] = None) -> Optional[dict]:
+        """Extract info then download with the same YoutubeDL instance (blocking), returns info or None"""
+        ydl = self._get_ydl(variant, ydl_opts)
+        info = ydl.extract_info(url, download=False)
+        if not info:
+            return None
+        if client_desc:
+            print(f"✅ Success with {client_desc}!")
+        print(f"📹 Video title: {info.get('title', 'Unknown')}")
+        print(f"⏱️  Duration: {info.get('duration', 0)} seconds")
+        print(f"🌐 Extractor: {info.get('extractor', 'Unknown')}")
+        
+        print(f"⬇️ Starting download{f' with {client_desc}' if client_desc else ''}...")
+        # Reuse the extracted info - ydl.download([url]) would resolve the URL a second time
+        return self._record_filepath(ydl, ydl.process_ie_result(info, download=True))
+    
+    def _ydl_download_info(self, info: dict, variant: str, ydl_opts: dict) -> dict:
+        """Download from an already-extracted info dict (blocking), returns the processed info"""
+        ydl = self._get_ydl(variant, ydl_opts)
+        return self._record_filepath(ydl, ydl.process_ie_result(info, download=True))
+    
+    @staticmethod
+    def _record_filepath(ydl, info: dict) -> dict:
+        """Store the file yt-dlp actually wrote in info['filepath'] (the extension depends on the chosen format)"""
+        downloads = info.get('requested_downloads') or [{}]
+        info['filepath'] = downloads[0].get('filepath') or ydl.prepare_filename(info)
+        return info
+    
+    async def _run_command(self, args: list, timeout: float) -> Tuple[int, bytes, bytes]:
+        """Run an external command without blocking the event loop, returns (returncode, stdout, stderr)"""
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        return proc.returncode, stdout, stderr
     
     async def extract_audio_from_video(self, video_path: str) -> Optional[str]:
         """Extract audio from video file using ffmpeg"""
         try:
-            if not self._check_ffmpeg():
+            if not await self._check_ffmpeg():
                 print(f"❌ ffmpeg không được tìm thấy! Không thể extract audio từ video.")
                 print(f"💡 Cài đặt ffmpeg: brew install ffmpeg (macOS) hoặc sudo apt-get install ffmpeg (Linux)")
                 return None
@@ -36,24 +251,22 @@ class MediaService:
             audio_path = f"{base_name}_audio.m4a"
             
             # Extract audio using ffmpeg
-            result = subprocess.run(
+            returncode, _, stderr = await self._run_command(
                 ['ffmpeg', '-i', video_path, '-vn', '-acodec', 'copy', '-y', audio_path],
-                capture_output=True,
                 timeout=300
             )
             
             # If copy codec fails, try re-encoding
-            if result.returncode != 0:
+            if returncode != 0:
                 print(f"⚠️ Audio copy failed, trying re-encode...")
-                result = subprocess.run(
+                returncode, _, stderr = await self._run_command(
                     ['ffmpeg', '-i', video_path, '-vn', '-acodec', 'aac', '-b:a', '128k', '-y', audio_path],
-                    capture_output=True,
                     timeout=300
                 )
             
-            if result.returncode != 0:
+            if returncode != 0:
                 print(f"❌ Failed to extract audio from video")
-                error_msg = result.stderr.decode('utf-8', errors='ignore')[:500]
+                error_msg = stderr.decode('utf-8', errors='ignore')[:500]
                 print(f"ffmpeg error: {error_msg}")
                 return None
             
@@ -71,12 +284,15 @@ class MediaService:
             traceback.print_exc()
             return None
     
-    async def download_video_audio(self, url: str) -> Optional[str]:
+    async def download_video_audio(self, url: str, output_name: Optional[str] = None) -> Optional[str]:
         """
         Download audio from video URL using optimized settings
         Uses aria2c for multi-connection downloads (2-5x faster)
         Falls back to concurrent fragment downloads if aria2c not available
+        output_name is the output path without extension (default: unique path in the temp dir)
+        The caller owns the returned file and must delete it when done
         """
+        output_name = output_name or self._new_temp_name()
         try:
             print(f"🎬 Đang tải video từ: {url}")
             
@@ -85,8 +301,14 @@ class MediaService:
                 print(f"❌ Invalid URL: {url}")
                 return None
             
+            # Same video already downloaded for someone else - skip yt-dlp entirely
+            cached_path = await asyncio.to_thread(self._get_cached_audio, url, output_name)
+            if cached_path:
+                print(f"♻️ Using cached audio: {cached_path}")
+                return cached_path
+            
             # Check if aria2c is available
-            has_aria2c = self._check_aria2c()
+            has_aria2c = await self._check_aria2c()
             
             # Check for proxy (cookies are not effective when IP is blocked)
             from src.config import Config
@@ -98,7 +320,7 @@ class MediaService:
             # Common options for both aria2c and fallback
             common_opts = {
                 'format': 'm4a/bestaudio/best',
-                'outtmpl': 'audio_temp.m4a',
+                'outtmpl': f'{output_name}.%(ext)s',
                 
                 # Add user-agent and headers to avoid HTTP 400 errors and bot detection
                 'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -140,190 +362,133 @@ class MediaService:
                     **common_opts,
                     # Use aria2c - professional download manager
                     'external_downloader': 'aria2c',
-                     'external_downloader_args': [
-                        '--max-connection-per-server=16',  # 16 connections per server
-                        '--split=16',                      # Split file into 16 parts
-                        '--min-split-size=1M',             # Split if file > 1MB
-                        '--max-concurrent-downloads=16',
-                        '--continue=true',                 # Resume support
-                        '--max-download-limit=0',          # No speed limit
-                    ],
+                    'external_downloader_args': self._aria2c_args(),
                 }
             else:
                 print(f"⚡ Using concurrent fragment downloads (aria2c not found)")
                 ydl_opts = {
                     **common_opts,
-                    # Fallback: concurrent fragment downloads
-                    'concurrent_fragment_downloads': 8,
-                    'http_chunk_size': 10485760,  # 10MB chunks
+                    # Fallback: concurrent fragment downloads (HLS/DASH fragments are small - fan out wide)
+                    'concurrent_fragment_downloads': Config.YTDLP_CONCURRENT_FRAGMENTS,
+                    'http_chunk_size': 5 * 1024 * 1024,  # 5MB chunks
+                    'retries': 10,
+                    'fragment_retries': 10,
+                    'file_access_retries': 5,
                 }
             
-            # Add error handling callback
-            def download_hook(d):
-                if d['status'] == 'error':
-                    print(f"❌ Download error: {d.get('error', 'Unknown error')}")
-                elif d['status'] == 'downloading':
-                    if 'total_bytes' in d:
-                        percent = d.get('downloaded_bytes', 0) / d['total_bytes'] * 100
-                        print(f"📥 Downloading: {percent:.1f}%")
-            
-            ydl_opts['progress_hooks'] = [download_hook]
-            
             try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    # Extract info first to validate URL
-                    try:
-                        print(f"🔍 Extracting video info from URL...")
-                        info = ydl.extract_info(url, download=False)
-                        if not info:
-                            print(f"❌ Could not extract video info from URL")
+                # Extract info first to validate URL, then download with the same instance
+                try:
+                    print(f"🔍 Extracting video info from URL...")
+                    info = await self._run_ydl(self._ydl_extract_and_download, url, 'default', ydl_opts)
+                    if not info:
+                        logger.error("Could not extract video info from URL")
+                        return None
+                
+                except DownloadError as extract_error:
+                    error_msg = str(extract_error)
+                    logger.error("Failed to extract video info: %s", error_msg)
+                    
+                    # Check for YouTube blocking (Failed to extract any player response or Failed to parse JSON)
+                    if 'Failed to extract any player response' in error_msg or 'Failed to parse JSON' in error_msg:
+                        logger.warning("YouTube blocking detected - trying multiple fallback methods...")
+                        
+                        # Try different player clients in order (prioritize mobile/TV clients)
+                        retry_clients = [
+                            ('android', 'Android client'),
+                            ('ios', 'iOS client'),
+                            ('tv', 'TV client'),
+                            ('mweb', 'Mobile web client'),
+                            ('web', 'Web client'),
+                        ]
+                        
+                        # Race the first few clients concurrently - first success wins
+                        winner = await self._race_player_clients(url, ydl_opts, retry_clients[:3])
+                        if not winner:
+                            await asyncio.sleep(2)  # Back off before the remaining clients to avoid rate limiting
+                            winner = await self._race_player_clients(url, ydl_opts, retry_clients[3:])
+                        
+                        if not winner:
+                            logger.error("All retry methods failed")
+                            print(f"💡 YouTube is heavily blocking requests. Solutions:")
+                            print(f"   1. Update yt-dlp: pip install -U yt-dlp (or use nightly build)")
+                            print(f"   2. Use cookies:")
+                            print(f"      - Set YOUTUBE_COOKIES_FILE=/path/to/cookies.txt (export from browser)")
+                            print(f"      - OR set YOUTUBE_COOKIES_FROM_BROWSER=chrome|firefox|edge (auto-extract)")
+                            print(f"      Export cookies using 'Get cookies.txt LOCALLY' extension")
+                            print(f"      See: https://github.com/yt-dlp/yt-dlp/wiki/FAQ#how-do-i-pass-cookies-to-yt-dlp")
+                            print(f"   3. Use proxy/VPN with residential IP (set HTTP_PROXY env var)")
+                            print(f"   4. Try again later (YouTube may rate limit)")
+                            print(f"   5. Consider using YouTube Data API for metadata (if video is public)")
                             return None
+                        
+                        client_name, client_desc, ydl_opts_retry, info = winner
+                        print(f"✅ Success with {client_desc}!")
                         print(f"📹 Video title: {info.get('title', 'Unknown')}")
                         print(f"⏱️  Duration: {info.get('duration', 0)} seconds")
-                        print(f"🌐 Extractor: {info.get('extractor', 'Unknown')}")
-                        
-                        # Download with original instance
-                        print(f"⬇️ Starting download...")
-                        ydl.download([url])
+                        print(f"⬇️ Starting download with {client_desc}...")
+                        info = await self._run_ydl(self._ydl_download_info, info, f"client:{client_name}", ydl_opts_retry)
+                        # If retry succeeded, continue to file check below
                         
-                    except DownloadError as extract_error:
-                        error_msg = str(extract_error)
-                        print(f"❌ Failed to extract video info: {error_msg}")
-                        
-                        # Check for YouTube blocking (Failed to extract any player response or Failed to parse JSON)
-                        if 'Failed to extract any player response' in error_msg or 'Failed to parse JSON' in error_msg:
-                            print(f"🤖 YouTube blocking detected - trying multiple fallback methods...")
-                            
-                            # Try different player clients in order (prioritize mobile/TV clients)
-                            retry_clients = [
-                                ('android', 'Android client'),
-                                ('ios', 'iOS client'),
-                                ('tv', 'TV client'),
-                                ('mweb', 'Mobile web client'),
-                                ('web', 'Web client'),
-                            ]
+                    # Check for bot detection
+                    elif 'Sign in to confirm you\'re not a bot' in error_msg or 'bot' in error_msg.lower():
+                        logger.warning("YouTube detected bot - trying alternative method...")
+                        # Try with different player client
+                        try:
+                            ydl_opts_retry = ydl_opts.copy()
+                            ydl_opts_retry['extractor_args'] = {
+                                'youtube': {
+                                    'player_client': ['ios', 'android'],  # Try iOS client
+                                    'player_js_version': 'actual',  # Use actual player JS version
+                                }
+                            }
+                            # Keep proxy if available
+                            if 'proxy' in ydl_opts:
+                                ydl_opts_retry['proxy'] = ydl_opts['proxy']
+                            logger.info("Retrying with iOS client...")
+                            info = await self._run_ydl(self._ydl_extract_and_download, url, 'bot-retry', ydl_opts_retry, "iOS client")
+                            if not info:
+                                raise DownloadError("Retry failed")
+                        except Exception as retry_error:
+                            logger.warning("Retry also failed: %s", retry_error)
+                            logger.info("Trying fallback method: pytubefix...")
                             
-                            retry_success = False
-                            for client_name, client_desc in retry_clients:
+                            # Try pytubefix as fallback
+                            if PYTUBEFIX_AVAILABLE:
                                 try:
-                                    print(f"🔄 Trying {client_desc}...")
-                                    import time
-                                    time.sleep(2)  # Longer delay between retries to avoid rate limiting
-                                    
-                                    ydl_opts_retry = ydl_opts.copy()
-                                    # Override extractor_args for this retry
-                                    ydl_opts_retry['extractor_args'] = {
-                                        'youtube': {
-                                            'player_client': [client_name],
-                                            'player_js_version': 'actual',  # Use actual player JS version
-                                        }
-                                    }
-                                    # Keep proxy if available
-                                    if 'proxy' in ydl_opts:
-                                        ydl_opts_retry['proxy'] = ydl_opts['proxy']
-                                    
-                                    with yt_dlp.YoutubeDL(ydl_opts_retry) as ydl_retry:
-                                        info = ydl_retry.extract_info(url, download=False)
-                                        if info:
-                                            print(f"✅ Success with {client_desc}!")
-                                            print(f"📹 Video title: {info.get('title', 'Unknown')}")
-                                            print(f"⏱️  Duration: {info.get('duration', 0)} seconds")
-                                            # Download immediately with retry instance
-                                            print(f"⬇️ Starting download with {client_desc}...")
-                                            ydl_retry.download([url])
-                                            retry_success = True
-                                            break  # Success, exit retry loop
-                                        else:
-                                            raise DownloadError(f"{client_desc} failed")
-                                except Exception as retry_error:
-                                    retry_error_msg = str(retry_error)
-                                    print(f"⚠️ {client_desc} failed: {retry_error_msg[:150]}")
-                                    if client_name == retry_clients[-1][0]:  # Last retry
-                                        print(f"❌ All retry methods failed")
-                                        print(f"💡 YouTube is heavily blocking requests. Solutions:")
-                                        print(f"   1. Update yt-dlp: pip install -U yt-dlp (or use nightly build)")
-                                        print(f"   2. Use cookies:")
-                                        print(f"      - Set YOUTUBE_COOKIES_FILE=/path/to/cookies.txt (export from browser)")
-                                        print(f"      - OR set YOUTUBE_COOKIES_FROM_BROWSER=chrome|firefox|edge (auto-extract)")
-                                        print(f"      Export cookies using 'Get cookies.txt LOCALLY' extension")
-                                        print(f"      See: https://github.com/yt-dlp/yt-dlp/wiki/FAQ#how-do-i-pass-cookies-to-yt-dlp")
-                                        print(f"   3. Use proxy/VPN with residential IP (set HTTP_PROXY env var)")
-                                        print(f"   4. Try again later (YouTube may rate limit)")
-                                        print(f"   5. Consider using YouTube Data API for metadata (if video is public)")
-                                        return None
-                                    continue  # Try next client
+                                    return await self._download_with_pytubefix(url, output_name)
+                                except Exception as pytube_error:
+                                    logger.warning("pytubefix also failed: %s", pytube_error)
                             
-                            if not retry_success:
-                                return None
-                            # If retry succeeded, continue to file check below
-                            
-                        # Check for bot detection
-                        elif 'Sign in to confirm you\'re not a bot' in error_msg or 'bot' in error_msg.lower():
-                            print(f"🤖 YouTube detected bot - trying alternative method...")
-                            # Try with different player client
-                            try:
-                                ydl_opts_retry = ydl_opts.copy()
-                                ydl_opts_retry['extractor_args'] = {
-                                    'youtube': {
-                                        'player_client': ['ios', 'android'],  # Try iOS client
-                                        'player_js_version': 'actual',  # Use actual player JS version
-                                    }
-                                }
-                                # Keep proxy if available
-                                if 'proxy' in ydl_opts:
-                                    ydl_opts_retry['proxy'] = ydl_opts['proxy']
-                                with yt_dlp.YoutubeDL(ydl_opts_retry) as ydl_retry:
-                                    print(f"🔄 Retrying with iOS client...")
-                                    info = ydl_retry.extract_info(url, download=False)
-                                    if info:
-                                        print(f"✅ Success with iOS client!")
-                                        print(f"📹 Video title: {info.get('title', 'Unknown')}")
-                                        print(f"⏱️  Duration: {info.get('duration', 0)} seconds")
-                                        # Download immediately with retry instance
-                                        print(f"⬇️ Starting download with iOS client...")
-                                        ydl_retry.download([url])
-                                    else:
-                                        raise DownloadError("Retry failed")
-                            except Exception as retry_error:
-                                print(f"❌ Retry also failed: {retry_error}")
-                                print(f"🔄 Trying fallback method: pytubefix...")
-                                
-                                # Try pytubefix as fallback
-                                if PYTUBEFIX_AVAILABLE:
-                                    try:
-                                        return await self._download_with_pytubefix(url)
-                                    except Exception as pytube_error:
-                                        print(f"❌ pytubefix also failed: {pytube_error}")
-                                
-                                print(f"💡 YouTube requires authentication. Solutions:")
-                                print(f"   1. Use proxy/VPN with residential IP (set YOUTUBE_PROXY env var)")
-                                print(f"   2. Try again later (YouTube may rate limit)")
-                                return None
-                        elif 'HTTP Error 400' in error_msg or 'Bad Request' in error_msg:
-                            print(f"💡 URL might be invalid or not supported by yt-dlp")
-                            print(f"💡 Supported sites: YouTube, Vimeo, Twitter, TikTok, etc.")
-                            return None
-                        elif 'HTTP Error 403' in error_msg or 'Forbidden' in error_msg:
-                            print(f"💡 Access forbidden - video might be private or region-locked")
+                            print(f"💡 YouTube requires authentication. Solutions:")
+                            print(f"   1. Use proxy/VPN with residential IP (set YOUTUBE_PROXY env var)")
+                            print(f"   2. Try again later (YouTube may rate limit)")
                             return None
-                        elif 'HTTP Error 404' in error_msg or 'Not Found' in error_msg:
-                            print(f"💡 Video not found - URL might be incorrect or video was deleted")
-                            return None
-                        else:
-                            return None
-                    except Exception as extract_error:
-                        error_type = type(extract_error).__name__
-                        error_msg = str(extract_error)
-                        print(f"❌ Failed to extract video info: {error_type}: {error_msg}")
-                        # Try to get more details
-                        if hasattr(extract_error, 'msg'):
-                            print(f"   Error message: {extract_error.msg}")
-                        import traceback
-                        traceback.print_exc()
+                    elif 'HTTP Error 400' in error_msg or 'Bad Request' in error_msg:
+                        print(f"💡 URL might be invalid or not supported by yt-dlp")
+                        print(f"💡 Supported sites: YouTube, Vimeo, Twitter, TikTok, etc.")
+                        return None
+                    elif 'HTTP Error 403' in error_msg or 'Forbidden' in error_msg:
+                        print(f"💡 Access forbidden - video might be private or region-locked")
+                        return None
+                    elif 'HTTP Error 404' in error_msg or 'Not Found' in error_msg:
+                        print(f"💡 Video not found - URL might be incorrect or video was deleted")
+                        return None
+                    else:
                         return None
+                except Exception as extract_error:
+                    error_type = type(extract_error).__name__
+                    error_msg = str(extract_error)
+                    logger.error("Failed to extract video info: %s: %s", error_type, error_msg)
+                    # Try to get more details
+                    if hasattr(extract_error, 'msg'):
+                        logger.error("Error message: %s", extract_error.msg)
+                    import traceback
+                    traceback.print_exc()
+                    return None
             except DownloadError as e:
                 error_msg = str(e)
-                print(f"❌ yt_dlp DownloadError: {error_msg}")
+                logger.error("yt_dlp DownloadError: %s", error_msg)
                 # Provide helpful error messages
                 if 'HTTP Error 400' in error_msg or 'Bad Request' in error_msg:
                     print(f"💡 This URL might not be supported or is invalid")
@@ -339,32 +504,140 @@ class MediaService:
                 # Catch other yt_dlp exceptions
                 error_type = type(e).__name__
                 error_msg = str(e)
-                print(f"❌ yt_dlp {error_type}: {error_msg}")
+                logger.error("yt_dlp %s: %s", error_type, error_msg)
                 import traceback
                 traceback.print_exc()
                 return None
             
-            # Check if file was created
-            if os.path.exists("audio_temp.m4a"):
-                file_size = os.path.getsize("audio_temp.m4a")
+            # Check if file was created (yt-dlp reports the path it wrote)
+            output_path = info.get('filepath')
+            if output_path and os.path.exists(output_path):
+                file_size = os.path.getsize(output_path)
                 file_size_mb = file_size / (1024 * 1024)
                 print(f"✅ Đã tải video thành công! File size: {file_size_mb:.2f} MB")
-                return "audio_temp.m4a"
+                await asyncio.to_thread(self._store_cached_audio, url, output_path)
+                return output_path
             else:
-                print(f"❌ File audio_temp.m4a không tồn tại sau khi tải")
-                # Check for other possible output files
-                possible_files = ['audio_temp.m4a', 'audio_temp.mp3', 'audio_temp.webm', 'audio_temp.opus']
-                for filename in possible_files:
-                    if os.path.exists(filename):
-                        print(f"⚠️ Found alternative file: {filename}")
-                        return filename
+                logger.error("File %s không tồn tại sau khi tải", output_path)
                 return None
         except Exception as e:
-            print(f"❌ Exception trong download_video_audio: {type(e).__name__}: {e}")
+            logger.error("Exception trong download_video_audio: %s: %s", type(e).__name__, e)
             import traceback
             traceback.print_exc()
             return None
     
+    def _extract_info_with_client(self, url: str, ydl_opts: dict, client_name: str) -> Tuple[dict, dict]:
+        """
+        Extract video info with a specific YouTube player client (blocking), returns (opts, info).
+        Extraction uses short race timeouts; the returned opts (used for the download) don't include them.
+        """
+        ydl_opts_retry = {
+            **ydl_opts,
+            'extractor_args': {
+                'youtube': {
+                    'player_client': [client_name],
+                    'player_js_version': 'actual',  # Use actual player JS version
+                }
+            },
+        }
+        info = self._get_ydl(f"race:{client_name}", {**ydl_opts_retry, **_RACE_PROBE_OPTS}).extract_info(url, download=False)
+        if not info:
+            raise DownloadError(f"{client_name} client returned no info")
+        return ydl_opts_retry, info
+    
+    async def _race_player_clients(self, url: str, ydl_opts: dict, clients: list) -> Optional[Tuple[str, str, dict, dict]]:
+        """
+        Try several player clients concurrently, return (client_name, client_desc, opts, info) of the
+        first one that succeeds (the rest are cancelled) or None if all fail
+        """
+        async def try_client(client_name: str, client_desc: str):
+            logger.info("Trying %s...", client_desc)
+            try:
+                opts, info = await self._run_ydl(self._extract_info_with_client, url, ydl_opts, client_name,
+                                                 executor=self._race_executor)
+            except Exception as retry_error:
+                logger.warning("%s failed: %.150s", client_desc, retry_error)
+                raise
+            return client_name, client_desc, opts, info
+        
+        tasks = [asyncio.create_task(try_client(name, desc)) for name, desc in clients]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    return await next_done
+                except Exception:
+                    continue
+            return None
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # Mark as retrieved - failures were already logged
+    
+    @staticmethod
+    def _audio_cache_key(url: str) -> str:
+        """Cache key: YouTube video ID when recognisable (any URL form), otherwise a hash of the URL"""
+        match = _YOUTUBE_ID_RE.search(url)
+        if match:
+            return f"yt_{match.group(1)}"
+        return f"url_{hashlib.sha1(url.strip().encode('utf-8')).hexdigest()}"
+    
+    def _get_cached_audio(self, url: str, output_name: str) -> Optional[str]:
+        """Copy of the cached audio for url at output_name (caller owns it), or None on a miss (blocking)"""
+        if AUDIO_CACHE_MAX_MB <= 0 or not os.path.isdir(AUDIO_CACHE_DIR):
+            return None
+        
+        prefix = self._audio_cache_key(url) + "."
+        try:
+            for entry in os.scandir(AUDIO_CACHE_DIR):
+                if entry.name.startswith(prefix):
+                    output_path = output_name + os.path.splitext(entry.name)[1]
+                    self._link_or_copy(entry.path, output_path)
+                    # Bump atime explicitly for LRU eviction (filesystems are often mounted noatime)
+                    os.utime(entry.path, (time.time(), entry.stat().st_mtime))
+                    return output_path
+        except OSError as e:
+            # Entry evicted mid-lookup, unreadable cache dir, ... - just download again
+            logger.debug("Audio cache lookup failed, treating as a miss: %s", e)
+        return None
+    
+    def _store_cached_audio(self, url: str, audio_path: str):
+        """Add a downloaded file to the cache and evict least recently used files over the limit (blocking)"""
+        if AUDIO_CACHE_MAX_MB <= 0:
+            return
+        try:
+            os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+            cached_path = os.path.join(AUDIO_CACHE_DIR, self._audio_cache_key(url) + os.path.splitext(audio_path)[1])
+            self._link_or_copy(audio_path, cached_path)
+            
+            entries = [(entry.path, entry.stat()) for entry in os.scandir(AUDIO_CACHE_DIR) if entry.is_file()]
+            total_size = sum(st.st_size for _, st in entries)
+            max_size = AUDIO_CACHE_MAX_MB * 1024 * 1024
+            for path, st in sorted(entries, key=lambda item: item[1].st_atime):
+                if total_size <= max_size:
+                    break
+                os.remove(path)
+                total_size -= st.st_size
+                print(f"🗑️ Evicted cached audio: {path}")
+        except OSError as e:
+            print(f"⚠️ Could not cache audio: {e}")
+    
+    @staticmethod
+    def _link_or_copy(src: str, dst: str):
+        """Hardlink src to dst (zero-copy), copying when they are on different filesystems"""
+        if os.path.exists(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+    
+    @staticmethod
+    def _new_temp_name() -> str:
+        """Unique download path (without extension) in the system temp dir"""
+        return os.path.join(tempfile.gettempdir(), f"audio_{uuid4().hex}")
+    
     def _is_storage_url(self, url: str) -> bool:
         """Check if URL is from Supabase storage or similar storage service"""
         if not url:
@@ -377,44 +650,55 @@ class MediaService:
             return True
         return False
     
-    async def download_from_storage_url(self, url: str, output_filename: str = "audio_temp.m4a") -> Optional[str]:
+    async def download_from_storage_url(self, url: str, output_filename: Optional[str] = None) -> Optional[str]:
         """
         Download file directly from storage URL (Supabase, S3, etc.)
-        Returns path to downloaded file
+        Returns path to downloaded file (default: unique path in the temp dir)
+        The caller owns the returned file and must delete it when done
         """
+        output_filename = output_filename or f"{self._new_temp_name()}.m4a"
         try:
             print(f"📥 Downloading from storage URL: {url[:100]}...")
             
-            # Download file
-            response = requests.get(url, stream=True, timeout=60)
-            response.raise_for_status()
-            
-            # Get file extension from URL or Content-Type
-            file_ext = os.path.splitext(url.split('?')[0])[1]  # Remove query params
-            if not file_ext:
-                # Try to get from Content-Type
-                content_type = response.headers.get('Content-Type', '')
-                if 'video' in content_type or 'audio' in content_type:
-                    if 'mp4' in content_type:
-                        file_ext = '.mp4'
-                    elif 'm4a' in content_type:
-                        file_ext = '.m4a'
-                    elif 'mp3' in content_type:
-                        file_ext = '.mp3'
+            # Download file (pooled connection)
+            async with self._http.stream('GET', url) as response:
+                response.raise_for_status()
+                
+                # Get file extension from URL or Content-Type
+                file_ext = os.path.splitext(url.split('?')[0])[1]  # Remove query params
+                if not file_ext:
+                    # Try to get from Content-Type
+                    content_type = response.headers.get('Content-Type', '')
+                    if 'video' in content_type or 'audio' in content_type:
+                        if 'mp4' in content_type:
+                            file_ext = '.mp4'
+                        elif 'm4a' in content_type:
+                            file_ext = '.m4a'
+                        elif 'mp3' in content_type:
+                            file_ext = '.mp3'
+                        else:
+                            file_ext = '.m4a'  # Default
                     else:
                         file_ext = '.m4a'  # Default
-                else:
-                    file_ext = '.m4a'  # Default
-            
-            # Determine output filename
-            if not output_filename.endswith(file_ext):
-                output_filename = f"audio_temp{file_ext}"
-            
-            # Download to file
-            with open(output_filename, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+                
+                # Determine output filename
+                if not output_filename.endswith(file_ext):
+                    output_filename = f"{os.path.splitext(output_filename)[0]}{file_ext}"
+                
+                # Download to file - disk writes run off the event loop and overlap the next read
+                async with aiofiles.open(output_filename, 'wb') as f:
+                    content_length = response.headers.get('Content-Length')
+                    # Content-Length is the encoded size, only preallocate for identity bodies
+                    if content_length and not response.headers.get('Content-Encoding') and hasattr(os, 'posix_fallocate'):
+                        try:
+                            os.posix_fallocate(f.fileno(), 0, int(content_length))
+                        except (OSError, ValueError):
+                            pass  # Not supported by this filesystem, just write normally
+                    
+                    async for chunk in response.aiter_bytes(1 << 20):  # 1 MiB chunks
+                        await f.write(chunk)
+                    # Drop any preallocated tail if the body came up short
+                    await f.truncate()
             
             if os.path.exists(output_filename):
                 file_size = os.path.getsize(output_filename)
@@ -431,23 +715,73 @@ class MediaService:
             traceback.print_exc()
             return None
     
-    def _check_ffmpeg(self) -> bool:
-        """Check if ffmpeg is available"""
-        try:
-            result = subprocess.run(['ffmpeg', '-version'], capture_output=True, timeout=5)
-            return result.returncode == 0
-        except:
-            return False
+    async def download_many(self, urls: Iterable[str], max_parallel: int = 4) -> List[Optional[str]]:
+        """
+        Download several URLs concurrently (storage URLs directly, others via yt-dlp)
+        Returns paths in the same order as urls (None for failed downloads)
+        """
+        semaphore = asyncio.Semaphore(max_parallel)
+        
+        async def download_one(url: str) -> Optional[str]:
+            async with semaphore:
+                # Each download gets its own temp path, so parallel jobs never collide
+                if self._is_storage_url(url):
+                    return await self.download_from_storage_url(url)
+                return await self.download_video_audio(url)
+        
+        return await asyncio.gather(*(download_one(url) for url in urls))
     
-    def _check_aria2c(self) -> bool:
-        """Check if aria2c is available"""
-        try:
-            result = subprocess.run(['aria2c', '--version'], capture_output=True, timeout=5)
-            return result.returncode == 0
-        except:
-            return False
+    async def _check_ffmpeg(self) -> bool:
+        """Check if ffmpeg is available (cached for the process after first call)"""
+        cls = type(self)
+        if cls._ffmpeg_available is None:
+            # PATH lookup is enough - no need to spawn `ffmpeg -version`
+            cls._ffmpeg_available = shutil.which('ffmpeg') is not None
+        return cls._ffmpeg_available
+    
+    async def _check_aria2c(self) -> bool:
+        """Check if aria2c is available and record its version (cached for the process after first call)"""
+        cls = type(self)
+        if cls._aria2c_available is None:
+            if shutil.which('aria2c') is None:
+                cls._aria2c_available = False
+                return False
+            # Only spawn when it's on PATH - the version gates the tuning flags in _aria2c_args
+            try:
+                returncode, stdout, _ = await self._run_command(['aria2c', '--version'], timeout=5)
+                cls._aria2c_available = returncode == 0
+                match = re.search(rb'aria2 version (\d+)\.(\d+)', stdout)
+                if match:
+                    cls._aria2c_version = tuple(int(part) for part in match.groups())
+            except Exception:
+                cls._aria2c_available = False
+        return cls._aria2c_available
     
-    async def _download_with_pytubefix(self, url: str) -> Optional[str]:
+    def _aria2c_args(self) -> list:
+        """Build aria2c arguments, adding tuning flags only when the installed version supports them"""
+        args = [
+            '--max-connection-per-server=16',  # 16 connections per server
+            '--split=16',                      # Split file into 16 parts
+            '--min-split-size=1M',             # Split if file > 1MB
+            '--max-concurrent-downloads=16',
+            '--continue=true',                 # Resume support
+            '--max-download-limit=0',          # No speed limit
+        ]
+        if self._aria2c_version and self._aria2c_version >= (1, 22):
+            args += [
+                '--enable-http-pipelining=true',   # Fewer round trips to CDN servers
+                '--http-no-cache=true',
+                '--optimize-concurrent-downloads=true',
+                '--piece-length=4M',               # Less per-piece overhead
+                '--lowest-speed-limit=100K',       # Drop stalled connections
+                '--timeout=30',
+                '--connect-timeout=10',
+            ]
+            if sys.platform.startswith('linux'):
+                args.append('--file-allocation=falloc')  # Contiguous preallocation without writing zeros
+        return args
+    
+    async def _download_with_pytubefix(self, url: str, output_name: Optional[str] = None) -> Optional[str]:
         """
         Fallback method using pytubefix when yt-dlp fails
         pytubefix sometimes works when yt-dlp is blocked
@@ -455,6 +789,7 @@ class MediaService:
         if not PYTUBEFIX_AVAILABLE:
             raise ImportError("pytubefix is not installed")
         
+        output_name = output_name or self._new_temp_name()
         try:
             print(f"🔄 Using pytubefix as fallback...")
             
@@ -471,28 +806,14 @@ class MediaService:
             print(f"⏱️  Duration: {yt.length} seconds")
             print(f"⬇️ Downloading audio with pytubefix...")
             
-            # Download to temp file
-            output_path = audio_stream.download(output_path=".", filename="audio_temp")
+            # Download straight to the final name - audio-only mp4 streams are m4a
+            ext = 'm4a' if audio_stream.subtype == 'mp4' else audio_stream.subtype
+            output_path = audio_stream.download(
+                output_path=os.path.dirname(output_name) or ".",
+                filename=f"{os.path.basename(output_name)}.{ext}"
+            )
             
-            # Convert to m4a if needed (pytubefix may download in different format)
             if output_path and os.path.exists(output_path):
-                # Check if file needs conversion
-                file_ext = os.path.splitext(output_path)[1].lower()
-                if file_ext != '.m4a':
-                    # Rename to audio_temp.m4a (ffmpeg will handle conversion if needed)
-                    m4a_path = "audio_temp.m4a"
-                    if os.path.exists(m4a_path):
-                        os.remove(m4a_path)
-                    os.rename(output_path, m4a_path)
-                    output_path = m4a_path
-                else:
-                    # Rename to standard name
-                    m4a_path = "audio_temp.m4a"
-                    if os.path.exists(m4a_path):
-                        os.remove(m4a_path)
-                    os.rename(output_path, m4a_path)
-                    output_path = m4a_path
-                
                 file_size = os.path.getsize(output_path)
                 file_size_mb = file_size / (1024 * 1024)
                 print(f"✅ Downloaded with pytubefix! File size: {file_size_mb:.2f} MB")
@@ -504,7 +825,8 @@ class MediaService:
             print(f"❌ pytubefix download failed: {type(e).__name__}: {e}")
             raise
     
-    async def _transcribe_with_ffmpeg_chunking(self, audio_path: str, max_chunk_size_mb: float = 10, recursion_depth: int = 0) -> Optional[str]:
+    async def _transcribe_with_ffmpeg_chunking(self, audio_path: str, max_chunk_size_mb: float = 10, recursion_depth: int = 0,
+                                               on_chunk: Optional[ChunkCallback] = None) -> Optional[str]:
         """Split audio file using ffmpeg"""
         try:
             # Max recursion depth to prevent infinite loops
@@ -513,7 +835,7 @@ class MediaService:
                 print(f"❌ Max recursion depth reached ({MAX_RECURSION}). Cannot split further.")
                 return None
             
-            if not self._check_ffmpeg():
+            if not await self._check_ffmpeg():
                 print(f"❌ ffmpeg không được tìm thấy! Không thể chia audio.")
                 print(f"💡 Cài đặt ffmpeg: brew install ffmpeg (macOS) hoặc sudo apt-get install ffmpeg (Linux)")
                 return None
@@ -521,30 +843,25 @@ class MediaService:
             file_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
             print(f"✂️ [Depth {recursion_depth}] Splitting {file_size_mb:.2f} MB file using ffmpeg...")
             
-            # Get audio duration using ffprobe
-            try:
-                result = subprocess.run(
-                    ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', 
-                     '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
-                    capture_output=True,
-                    text=True,
-                    timeout=10
-                )
-                
-                if result.returncode != 0:
-                    print(f"❌ Không thể lấy duration của audio file")
-                    print(f"ffprobe error: {result.stderr}")
-                    return None
-                
-                duration = float(result.stdout.strip())
-            except Exception as e:
-                print(f"❌ Exception khi lấy duration: {type(e).__name__}: {e}")
+            duration = await self._get_audio_duration(audio_path)
+            if duration is None:
                 return None
             
-            # Calculate chunk duration with safety margin (target 85% of max to ensure under limit)
-            safety_margin = 0.85
+            ext = os.path.splitext(audio_path)[1] or '.m4a'
+            
+            # Decide copy vs re-encode from the codec up front instead of letting a copy run fail first
+            codec, probed_bitrate = await asyncio.gather(self._probe_audio_codec(audio_path), self._probe_bitrate(audio_path))
+            reencode = codec not in _COPY_SAFE_CODECS.get(ext.lower(), ())
+            
+            # Size chunks from the bitrate the chunks will actually have (a byte budget, not a fixed
+            # time), so they land just under the limit instead of overshooting into recursion
+            if reencode:
+                bitrate_bps = _REENCODE_BITRATE_BPS
+            else:
+                bitrate_bps = probed_bitrate or (file_size_mb * 1024 * 1024 * 8 / duration)
+            safety_margin = 0.92
             target_chunk_size_mb = max_chunk_size_mb * safety_margin
-            chunk_duration = (target_chunk_size_mb / file_size_mb) * duration
+            chunk_duration = int(target_chunk_size_mb * 1024 * 1024 * 8 / bitrate_bps)
             
             # Ensure minimum chunk duration
             MIN_CHUNK_DURATION = 30  # seconds
@@ -555,163 +872,145 @@ class MediaService:
             
             print(f"📊 File size: {file_size_mb:.2f} MB")
             print(f"⏱️  Duration: {duration:.2f} seconds")
+            print(f"📈 Bitrate: {bitrate_bps / 1000:.0f} kbps{' (re-encode target)' if reencode else ''}")
             print(f"🎯 Target chunk size: {target_chunk_size_mb:.2f} MB (safety margin: {safety_margin})")
             print(f"✂️  Splitting into chunks of ~{chunk_duration:.2f} seconds each...")
             
-            # Use a unique temporary directory to avoid filename collisions
-            import tempfile
-            temp_dir = tempfile.mkdtemp(prefix="audio_chunks_")
+            # Unique per-job file prefix in the shared pool directory avoids filename collisions;
+            # the root is picked per job so a full tmpfs falls back to disk (chunks ~ input size)
+            job_id = uuid4().hex
+            pool_dir = _temp_pool(_chunk_temp_root(int(os.path.getsize(audio_path) * 1.1)))
+            chunk_prefix = os.path.join(pool_dir, f"{job_id}_chunk_")
             
             base_name = os.path.splitext(os.path.basename(audio_path))[0]
-            ext = os.path.splitext(audio_path)[1] or '.m4a'
             
-            # Use ffmpeg segment muxer for FAST parallel splitting (single pass)
-            # This is 6-8x faster than sequential chunk creation
-            print(f"🚀 Using ffmpeg segment muxer for fast splitting...")
-            import time
+            # Split with one ffmpeg process per chunk (-ss before -i seeks instantly, -c copy avoids
+            # re-encoding) - a single segment-muxer pass is sequential and bottlenecks on long files
+            n_chunks = math.ceil(duration / chunk_duration)
+            print(f"🚀 Splitting into {n_chunks} chunks with parallel ffmpeg...")
             split_start = time.time()
             
-            chunk_pattern = os.path.join(temp_dir, f"chunk_%03d{ext}")
-            
-            # Single ffmpeg command to split entire file
-            result = subprocess.run(
-                [
-                    'ffmpeg', '-i', audio_path,
-                    '-f', 'segment',                      # Use segment muxer
-                    '-segment_time', str(chunk_duration), # Split every N seconds
-                    '-c', 'copy',                         # Copy codec (fast, no re-encode)
-                    '-reset_timestamps', '1',             # Reset timestamp for each chunk
-                    '-y',                                 # Overwrite
-                    chunk_pattern
-                ],
-                capture_output=True,
-                timeout=300
-            )
-            
-            if result.returncode != 0:
-                print(f"⚠️ Segment with copy failed, trying with re-encode...")
-                result = subprocess.run(
-                    [
-                        'ffmpeg', '-i', audio_path,
-                        '-f', 'segment',
-                        '-segment_time', str(chunk_duration),
-                        '-acodec', 'libmp3lame',          # Re-encode if copy fails
-                        '-ar', '16000',
-                        '-ac', '1',
-                        '-b:a', '64k',
-                        '-reset_timestamps', '1',
-                        '-y',
-                        chunk_pattern
-                    ],
-                    capture_output=True,
-                    timeout=300
-                )
+            if reencode:
+                print(f"🔁 Codec {codec or 'unknown'} can't be stream-copied into {ext}, re-encoding chunks to mp3...")
             
-            if result.returncode != 0:
+            split_ok = await self._split_audio_parallel(audio_path, chunk_prefix, '.mp3' if reencode else ext,
+                                                        n_chunks, chunk_duration, reencode=reencode)
+            if not split_ok and not reencode:
+                print(f"⚠️ Split with copy failed, trying with re-encode...")
+                reencode = True
+                split_ok = await self._split_audio_parallel(audio_path, chunk_prefix, '.mp3', n_chunks, chunk_duration, reencode=True)
+            if not split_ok:
                 print(f"❌ Failed to split audio file")
-                print(f"ffmpeg error: {result.stderr.decode('utf-8', errors='ignore')[:500]}")
                 return None
+            chunk_ext = '.mp3' if reencode else ext
             
             split_elapsed = time.time() - split_start
             
-            # Collect created chunk files
-            chunk_paths = sorted([
-                os.path.join(temp_dir, f) 
-                for f in os.listdir(temp_dir) 
-                if f.startswith('chunk_') and f.endswith(ext)
-            ])
+            # Collect created chunk files with their sizes in one directory pass
+            chunks_info = sorted(
+                (entry.path, entry.stat().st_size)
+                for entry in os.scandir(pool_dir)
+                if entry.name.startswith(job_id) and entry.name.endswith(chunk_ext)
+            )
             
-            if not chunk_paths:
+            if not chunks_info:
                 print(f"❌ No chunks were created")
                 return None
             
-            # Log chunk sizes
-            for i, chunk_path in enumerate(chunk_paths, 1):
-                chunk_size_mb = os.path.getsize(chunk_path) / (1024 * 1024)
-                print(f"📦 Chunk {i}: {chunk_size_mb:.2f} MB")
-            
-            print(f"✅ Created {len(chunk_paths)} chunks in {split_elapsed:.1f}s (segment muxer)")
+            for i, (_, chunk_size) in enumerate(chunks_info, 1):
+                logger.info("📦 Chunk %d: %.2f MB", i, chunk_size / (1024 * 1024))
             
-            # Transcribe chunks in parallel with rate limiting
-            print(f"🚀 Starting parallel transcription (max 5 concurrent)...")
+            logger.info("✅ Created %d chunks in %.1fs (parallel ffmpeg)", len(chunks_info), split_elapsed)
             
-            # Semaphore to limit concurrent API calls
-            MAX_CONCURRENT_TRANSCRIPTIONS = 5
-            semaphore = asyncio.Semaphore(MAX_CONCURRENT_TRANSCRIPTIONS)
+            # Transcribe chunks in parallel - API calls are capped by the shared transcription limiter
+            logger.info("🚀 Starting parallel transcription (max %d concurrent)...", _transcription_limiter.max_active)
             
-            async def transcribe_chunk_with_limit(chunk_index, chunk_path):
-                """Transcribe a single chunk with concurrency control"""
-                async with semaphore:
-                    try:
-                        print(f"🎵 Transcribing chunk {chunk_index}/{len(chunk_paths)}...")
-                        
-                        chunk_size_mb = os.path.getsize(chunk_path) / (1024 * 1024)
-                        
-                        # Skip empty chunks
-                        if chunk_size_mb < 0.01:
-                            print(f"⚠️ Chunk {chunk_index} is too small ({chunk_size_mb:.2f} MB), skipping...")
-                            return None
-                        
-                        # Use stricter threshold (9.5 MB instead of 10 MB) to catch edge cases
-                        if chunk_size_mb > 9.5:
-                            print(f"⚠️ Chunk {chunk_index} is still too large ({chunk_size_mb:.2f} MB > 9.5 MB), recursively chunking...")
-                            text = await self._transcribe_with_ffmpeg_chunking(chunk_path, max_chunk_size_mb, recursion_depth + 1)
-                        else:
-                            text = await self._transcribe_single_audio(chunk_path)
-                        
-                        if text:
-                            print(f"✅ Chunk {chunk_index} transcribed successfully")
-                            return text
-                        else:
-                            print(f"⚠️ Chunk {chunk_index} transcription failed")
-                            return None
-                            
-                    except Exception as e:
-                        print(f"❌ Error transcribing chunk {chunk_index}: {e}")
+            async def transcribe_chunk_with_limit(chunk_index, chunk_path, chunk_size_bytes):
+                """Transcribe a single chunk (concurrency is limited around the API call)"""
+                try:
+                    logger.info("🎵 Transcribing chunk %d/%d...", chunk_index, len(chunks_info))
+                    
+                    chunk_size_mb = chunk_size_bytes / (1024 * 1024)
+                    
+                    # Skip empty chunks
+                    if chunk_size_mb < 0.01:
+                        logger.warning("⚠️ Chunk %d is too small (%.2f MB), skipping...", chunk_index, chunk_size_mb)
                         return None
-                    finally:
-                        # Clean up chunk file
-                        if os.path.exists(chunk_path):
-                            try:
-                                os.remove(chunk_path)
-                                print(f"🗑️ Deleted chunk {chunk_index}")
-                            except Exception as cleanup_error:
-                                print(f"⚠️ Could not delete chunk {chunk_index}: {cleanup_error}")
+                    
+                    # Use stricter threshold (9.5 MB instead of 10 MB) to catch edge cases
+                    if chunk_size_mb > 9.5:
+                        logger.warning("⚠️ Chunk %d is still too large (%.2f MB > 9.5 MB), recursively chunking...", chunk_index, chunk_size_mb)
+                        text = await self._transcribe_with_ffmpeg_chunking(chunk_path, max_chunk_size_mb, recursion_depth + 1)
+                    else:
+                        text = await self._transcribe_single_audio(chunk_path)
+                    
+                    if text:
+                        logger.info("✅ Chunk %d transcribed successfully", chunk_index)
+                        return text
+                    else:
+                        logger.warning("⚠️ Chunk %d transcription failed", chunk_index)
+                        return None
+                        
+                except Exception as e:
+                    logger.error("❌ Error transcribing chunk %d: %s", chunk_index, e)
+                    return None
+                finally:
+                    # Clean up chunk file (off the event loop - other chunks keep running)
+                    try:
+                        await asyncio.to_thread(os.unlink, chunk_path)
+                        logger.debug("🗑️ Deleted chunk %d", chunk_index)
+                    except FileNotFoundError:
+                        pass
+                    except Exception as cleanup_error:
+                        logger.warning("⚠️ Could not delete chunk %d: %s", chunk_index, cleanup_error)
+            
+            async def transcribe_chunk_indexed(chunk_index, chunk_path, chunk_size_bytes):
+                """Tag the result with its chunk index (as_completed yields in completion order)"""
+                try:
+                    return chunk_index, await transcribe_chunk_with_limit(chunk_index, chunk_path, chunk_size_bytes)
+                except Exception as e:
+                    logger.warning("⚠️ Chunk %d raised exception: %s", chunk_index, e)
+                    return chunk_index, None
             
             # Create tasks for all chunks
             tasks = [
-                transcribe_chunk_with_limit(i, chunk_path) 
-                for i, chunk_path in enumerate(chunk_paths, 1)
+                transcribe_chunk_indexed(i, chunk_path, chunk_size) 
+                for i, (chunk_path, chunk_size) in enumerate(chunks_info, 1)
             ]
             
-            # Execute all tasks in parallel (with semaphore limiting concurrency)
-            import time
+            # Execute all tasks in parallel, emitting results in order as soon as each contiguous prefix is done
             start_time = time.time()
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            elapsed = time.time() - start_time
-            
-            # Filter out None and exceptions
             transcriptions = []
-            for i, result in enumerate(results, 1):
-                if isinstance(result, Exception):
-                    print(f"⚠️ Chunk {i} raised exception: {result}")
-                elif result:
-                    transcriptions.append(result)
+            pending = {}
+            next_to_emit = 1
+            for next_done in asyncio.as_completed(tasks):
+                chunk_index, text = await next_done
+                pending[chunk_index] = text
+                while next_to_emit in pending:
+                    text = pending.pop(next_to_emit)
+                    if text:
+                        transcriptions.append(text)
+                    if on_chunk:
+                        try:
+                            await on_chunk(next_to_emit, len(chunks_info), text)
+                        except Exception as callback_error:
+                            logger.warning("⚠️ on_chunk callback failed: %s", callback_error)
+                    next_to_emit += 1
+            elapsed = time.time() - start_time
             
-            print(f"⚡ Parallel transcription completed in {elapsed:.1f}s ({len(transcriptions)}/{len(chunk_paths)} successful)")
+            logger.info("⚡ Parallel transcription completed in %.1fs (%d/%d successful)", elapsed, len(transcriptions), len(chunks_info))
             
             # Clean up temp directory
+            # Chunks delete themselves - this only catches leftovers; the pool directory stays
             try:
-                import shutil
-                shutil.rmtree(temp_dir)
-                print(f"🗑️ Cleaned up temp directory: {temp_dir}")
+                await asyncio.to_thread(self._remove_job_files, pool_dir, job_id)
             except Exception as e:
-                print(f"⚠️ Could not clean up temp directory: {e}")
+                logger.warning("⚠️ Could not clean up chunk files: %s", e)
             
             # Merge all transcriptions
             if transcriptions:
                 merged_text = "\n\n".join(transcriptions)
-                print(f"✅ Merged transcription from {len(transcriptions)}/{len(chunk_paths)} chunks: {len(merged_text)} chars")
+                logger.info("✅ Merged transcription from %d/%d chunks: %d chars", len(transcriptions), len(chunks_info), len(merged_text))
                 return merged_text
             else:
                 print(f"❌ All chunks failed to transcribe")
@@ -721,25 +1020,171 @@ class MediaService:
             print(f"❌ Exception in ffmpeg chunking: {type(e).__name__}: {e}")
             import traceback
             traceback.print_exc()
-            # Clean up temp directory if it exists
+            # Clean up this job's chunk files if any were created
             try:
-                if 'temp_dir' in locals() and os.path.exists(temp_dir):
-                    import shutil
-                    shutil.rmtree(temp_dir)
-                    print(f"🗑️ Cleaned up temp directory after error")
+                if 'pool_dir' in locals():
+                    await asyncio.to_thread(self._remove_job_files, pool_dir, job_id)
+                    print(f"🗑️ Cleaned up chunk files after error")
             except Exception as cleanup_error:
-                print(f"⚠️ Could not clean up temp directory: {cleanup_error}")
+                print(f"⚠️ Could not clean up chunk files: {cleanup_error}")
+            return None
+    
+    async def _get_audio_duration(self, audio_path: str) -> Optional[float]:
+        """Get audio duration from container metadata (mutagen), falling back to ffprobe"""
+        try:
+            audio_info = MutagenFile(audio_path)
+            if audio_info and audio_info.info.length:
+                return float(audio_info.info.length)
+        except Exception as e:
+            print(f"⚠️ mutagen could not read duration ({type(e).__name__}: {e}), trying ffprobe...")
+        
+        try:
+            returncode, stdout, stderr = await self._run_command(
+                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', 
+                 '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
+                timeout=10
+            )
+            
+            if returncode != 0:
+                print(f"❌ Không thể lấy duration của audio file")
+                print(f"ffprobe error: {stderr.decode('utf-8', errors='ignore')}")
+                return None
+            
+            return float(stdout.decode().strip())
+        except Exception as e:
+            print(f"❌ Exception khi lấy duration: {type(e).__name__}: {e}")
+            return None
+    
+    async def _probe_audio_codec(self, audio_path: str) -> Optional[str]:
+        """Codec name of the first audio stream (metadata-only ffprobe), None if it can't be read"""
+        try:
+            returncode, stdout, _ = await self._run_command(
+                ['ffprobe', '-v', 'error', '-select_streams', 'a:0', '-show_entries', 'stream=codec_name',
+                 '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
+                timeout=10
+            )
+            if returncode != 0:
+                return None
+            return stdout.decode('utf-8', errors='ignore').strip().lower() or None
+        except Exception as e:
+            print(f"⚠️ ffprobe could not read codec ({type(e).__name__}: {e})")
             return None
     
+    async def _probe_bitrate(self, audio_path: str) -> Optional[int]:
+        """Overall bitrate in bits/s from container metadata (ffprobe), None if unknown"""
+        try:
+            returncode, stdout, _ = await self._run_command(
+                ['ffprobe', '-v', 'error', '-show_entries', 'format=bit_rate',
+                 '-of', 'default=noprint_wrappers=1:nokey=1', audio_path],
+                timeout=10
+            )
+            if returncode != 0:
+                return None
+            bitrate = int(stdout.decode('utf-8', errors='ignore').strip())
+            return bitrate if bitrate > 0 else None
+        except Exception:
+            # 'N/A' for streams without a container bitrate - caller falls back to size / duration
+            return None
+    
+    @staticmethod
+    def _remove_files(paths: Iterable[str]):
+        """Delete files, ignoring ones that are already gone (blocking - run via asyncio.to_thread)"""
+        for path in paths:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+    
+    @staticmethod
+    def _remove_job_files(pool_dir: str, job_id: str):
+        """Delete whatever files a chunking job left in the shared pool directory (blocking)"""
+        for entry in os.scandir(pool_dir):
+            if entry.name.startswith(job_id):
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+    
+    async def _split_audio_parallel(self, audio_path: str, chunk_prefix: str, ext: str, n_chunks: int,
+                                    chunk_duration: float, reencode: bool = False) -> bool:
+        """Cut audio into {chunk_prefix}000{ext}, {chunk_prefix}001{ext}, ... with parallel ffmpeg processes"""
+        if reencode:
+            codec_args = ['-acodec', 'libmp3lame', '-ar', '16000', '-ac', '1', '-b:a', f"{_REENCODE_BITRATE_BPS // 1000}k"]
+        else:
+            codec_args = ['-c', 'copy']
+        
+        # One process per core - more just thrashes the disk
+        semaphore = asyncio.Semaphore(os.cpu_count() or 4)
+        
+        async def cut_chunk(i: int) -> bool:
+            async with semaphore:
+                chunk_path = f"{chunk_prefix}{i:03d}{ext}"
+                returncode, _, stderr = await self._run_command(
+                    ['ffmpeg', '-ss', str(i * chunk_duration), '-t', str(chunk_duration),
+                     '-i', audio_path, *codec_args, '-y', chunk_path],
+                    timeout=300
+                )
+                if returncode != 0:
+                    print(f"ffmpeg error (chunk {i}): {stderr.decode('utf-8', errors='ignore')[:500]}")
+                    return False
+                return True
+        
+        try:
+            results = await asyncio.gather(*(cut_chunk(i) for i in range(n_chunks)))
+        except Exception as e:
+            print(f"❌ ffmpeg split error: {type(e).__name__}: {e}")
+            results = [False]
+        
+        if all(results):
+            return True
+        
+        # Drop partial output so a retry starts clean
+        await asyncio.to_thread(self._remove_files, [f"{chunk_prefix}{i:03d}{ext}" for i in range(n_chunks)])
+        return False
+    
     async def _transcribe_single_audio(self, audio_path: str) -> Optional[str]:
         """Transcribe a single audio file"""
         try:
-            file_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
-            
-            with open(audio_path, "rb") as f:
-                audio_base64 = base64.b64encode(f.read()).decode('utf-8')
+            # Hold a slot while the file is in memory too, so waiting chunks don't all load at once
+            async with _transcription_limiter:
+                # One worker-thread hop for open+read+close (aiofiles pays one per call)
+                audio_bytes = await asyncio.to_thread(self._read_file_bytes, audio_path)
+                
+                return await self._transcribe_audio_bytes(audio_bytes)
+        except Exception as e:
+            print(f"❌ Exception in transcribe: {e}")
+            import traceback
+            traceback.print_exc()
+            return None
+    
+    @staticmethod
+    def _read_file_bytes(path: str) -> bytes:
+        """Read a whole file (blocking)"""
+        with open(path, "rb") as f:
+            return f.read()
+    
+    @staticmethod
+    async def _b64encode_cooperative(data: bytes, slice_size: int = 3 << 20) -> bytes:
+        """
+        base64-encode in 3-byte-aligned slices, yielding to the event loop between them.
+        binascii holds the GIL for the whole call, so a worker thread would stall the loop just the same.
+        """
+        view = memoryview(data)
+        parts = []
+        for offset in range(0, len(view), slice_size):
+            parts.append(base64.b64encode(view[offset:offset + slice_size]))
+            await asyncio.sleep(0)
+        return b"".join(parts)
+    
+    async def _transcribe_audio_bytes(self, audio_bytes: bytes) -> Optional[str]:
+        """Transcribe audio already held in memory"""
+        try:
+            file_size_mb = len(audio_bytes) / (1024 * 1024)
+            # Kept as bytes - the API splices it into the body as-is
+            audio_base64 = await self._b64encode_cooperative(audio_bytes)
             
-            result = self.api.transcribe_audio(audio_base64)
+            # Blocking HTTP call - run it in a thread so parallel chunks actually overlap
+            result = await asyncio.to_thread(self.api.transcribe_audio, audio_base64)
             
             if result:
                 return result
@@ -754,8 +1199,91 @@ class MediaService:
             traceback.print_exc()
             return None
     
-    async def transcribe_audio(self, audio_path: str) -> Optional[str]:
-        """Main transcribe function with automatic chunking"""
+    async def extract_audio_stream(self, video_path: str, chunk_size: int = 1 << 20,
+                                   copy: bool = False) -> AsyncIterator[bytes]:
+        """Stream the audio track of a video as AAC (ADTS) straight from ffmpeg's stdout (copy=True if it is already AAC)"""
+        codec_args = ['-c:a', 'copy'] if copy else ['-c:a', 'aac', '-b:a', '128k']
+        proc = await asyncio.create_subprocess_exec(
+            'ffmpeg', '-i', video_path, '-vn', *codec_args, '-f', 'adts', 'pipe:1',
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        try:
+            while True:
+                chunk = await proc.stdout.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+            
+            returncode = await proc.wait()
+            if returncode != 0:
+                raise RuntimeError(f"ffmpeg exited with code {returncode}")
+        finally:
+            # Consumer stopped early (or errored) - don't leave ffmpeg running
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+    
+    async def transcribe_video(self, video_path: str,
+                               on_chunk: Optional[ChunkCallback] = None) -> Tuple[Optional[str], int]:
+        """
+        Transcribe the audio track of a video without an intermediate audio file when it fits
+        in a single request. Longer audio is spilled to disk and goes through chunking.
+        Returns (transcription, duration in seconds - 0 if unknown).
+        """
+        if not await self._check_ffmpeg():
+            print(f"❌ ffmpeg không được tìm thấy! Không thể extract audio từ video.")
+            print(f"💡 Cài đặt ffmpeg: brew install ffmpeg (macOS) hoặc sudo apt-get install ffmpeg (Linux)")
+            return None, 0
+        
+        # Duration via mutagen, else ffprobe (mutagen can't read Matroska/WebM/AVI)
+        codec, duration = await asyncio.gather(self._probe_audio_codec(video_path), self._get_audio_duration(video_path))
+        duration = int(duration or 0)
+        return await self._transcribe_video_audio(video_path, codec == 'aac', on_chunk), duration
+    
+    async def _transcribe_video_audio(self, video_path: str, copy: bool,
+                                      on_chunk: Optional[ChunkCallback]) -> Optional[str]:
+        """Body of transcribe_video - streams the audio track (stream-copied when it is already AAC)"""
+        print(f"🎬 Streaming audio from video: {video_path}{' (AAC copy)' if copy else ''}")
+        max_bytes = MAX_FILE_SIZE_MB * 1024 * 1024
+        buffer = bytearray()
+        spill_path = None
+        stream = self.extract_audio_stream(video_path, copy=copy)
+        try:
+            async for chunk in stream:
+                buffer += chunk
+                if len(buffer) > max_bytes:
+                    break
+            
+            if len(buffer) <= max_bytes:
+                print(f"✅ Extracted audio in memory ({len(buffer) / (1024 * 1024):.2f} MB), transcribing directly...")
+                async with _transcription_limiter:
+                    return await self._transcribe_audio_bytes(bytes(buffer))
+            
+            # Too large for one request - write the rest to disk for the chunking path
+            spill_path = f"{os.path.splitext(video_path)[0]}_audio.aac"
+            async with aiofiles.open(spill_path, 'wb') as f:
+                await f.write(buffer)
+                buffer.clear()
+                async for chunk in stream:
+                    await f.write(chunk)
+            return await self.transcribe_audio(spill_path, on_chunk)
+        except Exception as e:
+            print(f"⚠️ Streaming extraction failed ({type(e).__name__}: {e}), falling back to file extraction...")
+            audio_path = await self.extract_audio_from_video(video_path)
+            if not audio_path:
+                return None
+            try:
+                return await self.transcribe_audio(audio_path, on_chunk)
+            finally:
+                await asyncio.to_thread(self._remove_files, [audio_path])
+        finally:
+            await stream.aclose()
+            if spill_path:
+                await asyncio.to_thread(self._remove_files, [spill_path])
+    
+    async def transcribe_audio(self, audio_path: str, on_chunk: Optional[ChunkCallback] = None) -> Optional[str]:
+        """Main transcribe function with automatic chunking (on_chunk reports progress of chunked files)"""
         try:
             file_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
             print(f"📊 Audio file size: {file_size_mb:.2f} MB")
@@ -767,7 +1295,7 @@ class MediaService:
             
             # File is too large, must split into chunks
             print(f"✂️ File too large ({file_size_mb:.2f} MB > {MAX_FILE_SIZE_MB} MB), splitting into chunks...")
-            return await self._transcribe_with_ffmpeg_chunking(audio_path, MAX_FILE_SIZE_MB)
+            return await self._transcribe_with_ffmpeg_chunking(audio_path, MAX_FILE_SIZE_MB, on_chunk=on_chunk)
                 
         except Exception as e:
             print(f"❌ Exception in transcribe_audio: {type(e).__name__}: {e}")
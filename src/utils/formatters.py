@@ -1,5 +1,12 @@
 from datetime import datetime
 
+_EMOJI_MAP = {
+    "audio": "🎵",
+    "video": "🎬",
+    "voice_message": "🎤",
+    "url": "🔗"
+}
+
 def format_duration(seconds: int) -> str:
     """Format duration compactly: 2723 → 45m"""
     if seconds == 0:
@@ -18,7 +25,7 @@ def format_date_compact(timestamp: str) -> str:
     try:
         dt = datetime.fromisoformat(timestamp)
         return f"{dt.day}/{dt.month}"
-    except:
+    except (TypeError, ValueError):
         return "N/A"
 
 def truncate_with_ellipsis(text: str, max_len: int) -> str:
@@ -29,11 +36,5 @@ def truncate_with_ellipsis(text: str, max_len: int) -> str:
 
 def format_source_emoji(source_type: str) -> str:
     """Get emoji for source type"""
-    emoji_map = {
-        "audio": "🎵",
-        "video": "🎬",
-        "voice_message": "🎤",
-        "url": "🔗"
-    }
-    return emoji_map.get(source_type, "📄")
+    return _EMOJI_MAP.get(source_type, "📄")
 
@@ -1,71 +1,58 @@
+import os
+from enum import Enum
 from telethon.tl.types import MessageMediaPhoto, MessageMediaDocument, DocumentAttributeAudio
 
-def is_photo(media) -> bool:
-    """Check if media is photo"""
-    if isinstance(media, MessageMediaPhoto):
-        return True
-    if isinstance(media, MessageMediaDocument):
-        doc = media.document
-        if doc:
-            if hasattr(doc, 'mime_type') and doc.mime_type and doc.mime_type.lower().startswith('image/'):
-                return True
-            if hasattr(doc, 'attributes'):
-                image_exts = ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.svg', '.ico']
-                for attr in doc.attributes:
-                    if hasattr(attr, 'file_name') and attr.file_name:
-                        if any(attr.file_name.lower().endswith(ext) for ext in image_exts):
-                            return True
-    return False
+class MediaKind(Enum):
+    """Kind of media attached to a message"""
+    PHOTO = "photo"
+    AUDIO = "audio"
+    VIDEO = "video"
+    OTHER = "other"
 
-def is_voice_or_audio(media) -> bool:
-    """Check if media is voice message or audio file"""
+_IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.svg', '.ico'})
+_AUDIO_EXTS = frozenset({'.m4a', '.mp3', '.wav', '.ogg', '.flac', '.aac', '.opus'})
+_VIDEO_EXTS = frozenset({'.mp4', '.mkv', '.avi', '.mov', '.flv', '.wmv', '.webm', '.m4v', '.mpeg', '.mpg'})
+
+def classify_media(media) -> MediaKind:
+    """Classify media in one pass over the document (photo > audio > video when signals overlap)"""
+    if isinstance(media, MessageMediaPhoto):
+        return MediaKind.PHOTO
     if not isinstance(media, MessageMediaDocument):
-        return False
+        return MediaKind.OTHER
     
     doc = media.document
     if not doc:
-        return False
-    
-    # Check mime type
-    if hasattr(doc, 'mime_type') and doc.mime_type:
-        if doc.mime_type.startswith('audio/'):
-            return True
-    
-    # Check attributes for voice or audio
-    if hasattr(doc, 'attributes'):
-        for attr in doc.attributes:
-            # Voice messages have DocumentAttributeAudio with voice=True
-            if isinstance(attr, DocumentAttributeAudio):
-                return True
-            # Check file extensions
-            if hasattr(attr, 'file_name') and attr.file_name:
-                audio_exts = ['.m4a', '.mp3', '.wav', '.ogg', '.flac', '.aac', '.opus']
-                if any(attr.file_name.lower().endswith(ext) for ext in audio_exts):
-                    return True
-    
-    return False
+        return MediaKind.OTHER
+    
+    mime = (getattr(doc, 'mime_type', None) or '').lower()
+    
+    # Walk attributes once: voice/audio attribute + file extensions
+    has_audio_attr = False
+    exts = set()
+    for attr in getattr(doc, 'attributes', None) or ():
+        # Voice messages have DocumentAttributeAudio with voice=True
+        if isinstance(attr, DocumentAttributeAudio):
+            has_audio_attr = True
+        file_name = getattr(attr, 'file_name', None)
+        if file_name:
+            exts.add(os.path.splitext(file_name)[1].lower())
+    
+    if mime.startswith('image/') or not exts.isdisjoint(_IMAGE_EXTS):
+        return MediaKind.PHOTO
+    if mime.startswith('audio/') or has_audio_attr or not exts.isdisjoint(_AUDIO_EXTS):
+        return MediaKind.AUDIO
+    if mime.startswith('video/') or not exts.isdisjoint(_VIDEO_EXTS):
+        return MediaKind.VIDEO
+    return MediaKind.OTHER
+
+def is_photo(media) -> bool:
+    """Check if media is photo"""
+    return classify_media(media) is MediaKind.PHOTO
+
+def is_voice_or_audio(media) -> bool:
+    """Check if media is voice message or audio file"""
+    return classify_media(media) is MediaKind.AUDIO
 
 def is_video(media) -> bool:
     """Check if media is video file"""
-    if not isinstance(media, MessageMediaDocument):
-        return False
-    
-    doc = media.document
-    if not doc:
-        return False
-    
-    # Check mime type for video
-    if hasattr(doc, 'mime_type') and doc.mime_type:
-        if doc.mime_type.startswith('video/'):
-            return True
-    
-    # Check file extensions for video
-    if hasattr(doc, 'attributes'):
-        for attr in doc.attributes:
-            if hasattr(attr, 'file_name') and attr.file_name:
-                video_exts = ['.mp4', '.mkv', '.avi', '.mov', '.flv', '.wmv', '.webm', '.m4v', '.mpeg', '.mpg']
-                if any(attr.file_name.lower().endswith(ext) for ext in video_exts):
-                    return True
-    
-    return False
-
+    return classify_media(media) is MediaKind.VIDEO
@@ -1,7 +1,26 @@
 import asyncio
+import itertools
+from typing import List
 from src.config import MAX_MESSAGE_LENGTH
 from telethon.errors import FloodWaitError
 
+def _pack(pieces: List[str], sep: str, max_size: int) -> List[str]:
+    """
+    Greedily group consecutive pieces into chunks of at most max_size (a single oversized piece
+    becomes its own chunk). Prefix sums + one join per chunk instead of repeated string appends.
+    """
+    step = len(sep)
+    cum = [0, *itertools.accumulate(len(piece) + step for piece in pieces)]
+    chunks = []
+    i, n = 0, len(pieces)
+    while i < n:
+        j = i + 1
+        while j < n and cum[j + 1] - cum[i] <= max_size:
+            j += 1
+        chunks.append((sep.join(pieces[i:j]) + sep).strip())
+        i = j
+    return chunks
+
 async def send_long_message(event, text: str, prefix: str = ""):
     """
     Split and send long messages
@@ -20,19 +39,7 @@ async def send_long_message(event, text: str, prefix: str = ""):
         return
     
     # Split by paragraphs first
-    chunks = []
-    current_chunk = ""
-    
-    for paragraph in text.split('\n\n'):
-        if len(current_chunk) + len(paragraph) + 2 <= max_chunk_size:
-            current_chunk += paragraph + '\n\n'
-        else:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            current_chunk = paragraph + '\n\n'
-    
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+    chunks = _pack(text.split('\n\n'), '\n\n', max_chunk_size)
     
     # If still too long, split by sentences
     final_chunks = []
@@ -40,18 +47,7 @@ async def send_long_message(event, text: str, prefix: str = ""):
         if len(chunk) <= max_chunk_size:
             final_chunks.append(chunk)
         else:
-            # Split by sentences
-            sentences = chunk.split('. ')
-            temp = ""
-            for sentence in sentences:
-                if len(temp) + len(sentence) + 2 <= max_chunk_size:
-                    temp += sentence + '. '
-                else:
-                    if temp:
-                        final_chunks.append(temp.strip())
-                    temp = sentence + '. '
-            if temp:
-                final_chunks.append(temp.strip())
+            final_chunks.extend(_pack(chunk.split('. '), '. ', max_chunk_size))
     
     # Send chunks
     for i, chunk in enumerate(final_chunks):
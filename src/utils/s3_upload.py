@@ -3,9 +3,11 @@ S3 upload module.
 Handles uploading files (images, videos, audio) to AWS S3.
 """
 import os
+import asyncio
 import logging
 import boto3
 import mimetypes
+from boto3.s3.transfer import TransferConfig
 from src.config import Config
 
 logger = logging.getLogger(__name__)
@@ -13,6 +15,23 @@ logger = logging.getLogger(__name__)
 # Initialize S3 client
 s3_client = None
 
+# Multipart upload in 16 MB parts over 10 threads for anything above 8 MB
+_TRANSFER_CFG = TransferConfig(
+    multipart_threshold=8 << 20,
+    multipart_chunksize=16 << 20,
+    max_concurrency=10,
+    use_threads=True,
+    max_io_queue=100,
+)
+
+# Fallback Content-Type by lowercased extension, for types mimetypes doesn't know
+_EXT_CT = {
+    '.webp': 'image/webp',
+    '.mp4': 'video/mp4', '.mov': 'video/mp4', '.avi': 'video/mp4', '.wmv': 'video/mp4', '.webm': 'video/mp4',
+    '.mp3': 'audio/mpeg', '.wav': 'audio/mpeg', '.m4a': 'audio/mpeg',
+    '.txt': 'text/plain; charset=utf-8', '.text': 'text/plain; charset=utf-8',
+}
+
 def init_s3_client():
     """Initialize S3 client from config."""
     global s3_client
@@ -51,20 +70,8 @@ def upload_file_to_s3(local_path, s3_path, content_type=None):
     try:
         # Auto-detect content type if not provided
         if content_type is None:
-            content_type, _ = mimetypes.guess_type(local_path)
-            if content_type is None:
-                # Fallback based on extension
-                ext = os.path.splitext(local_path)[1].lower()
-                if ext == '.webp':
-                    content_type = 'image/webp'
-                elif ext in ['.mp4', '.mov', '.avi', '.wmv', '.webm']:
-                    content_type = 'video/mp4'
-                elif ext in ['.mp3', '.wav', '.m4a']:
-                    content_type = 'audio/mpeg'
-                elif ext in ['.txt', '.text']:
-                    content_type = 'text/plain; charset=utf-8'
-                else:
-                    content_type = 'application/octet-stream'
+            ext = os.path.splitext(local_path)[1].lower()
+            content_type = mimetypes.guess_type(local_path)[0] or _EXT_CT.get(ext, 'application/octet-stream')
         
         # Ensure UTF-8 charset for text files
         if content_type and 'text' in content_type and 'charset' not in content_type:
@@ -75,7 +82,8 @@ def upload_file_to_s3(local_path, s3_path, content_type=None):
             Filename=local_path,
             Bucket=Config.S3_BUCKET,
             Key=s3_path,
-            ExtraArgs={"ContentType": content_type}
+            ExtraArgs={"ContentType": content_type},
+            Config=_TRANSFER_CFG
         )
         
         # Generate public URL
@@ -88,6 +96,17 @@ def upload_file_to_s3(local_path, s3_path, content_type=None):
         return None
 
 
+async def upload_file_to_s3_async(local_path, s3_path, content_type=None):
+    """
+    Async wrapper for upload_file_to_s3 - runs the transfer in a worker thread
+    so the event loop isn't blocked while the parts upload.
+    
+    Returns:
+        str: Public URL of uploaded file, or None on error
+    """
+    return await asyncio.to_thread(upload_file_to_s3, local_path, s3_path, content_type)
+
+
 def upload_image_webp(local_path, s3_path):
     """
     Upload WEBP image to S3.